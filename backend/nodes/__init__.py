@@ -1,18 +1,16 @@
-from .patches import *
+from .patches import __patch_version__
 from .base import Node
 from functools import lru_cache as _lru_cache
-from .manager import NodeManager
-from typing import Type
-
-NodeRegistry = dict[str, dict[int, Type[Node]]]
+from .manager import NodeManager, NodeRegistry, SOURCES_TIMEOUT, discover_sources
 
 
 @_lru_cache
+def get_node_manager() -> NodeManager:
+    """The node manager of the process, with every discovered source, see
+    `discover_sources` and `NodeManager.reload`."""
+    return NodeManager(sources=discover_sources(), timeout=SOURCES_TIMEOUT)
+
+
 def get_node_registry() -> NodeRegistry:
-    # Get sources from somewhere
-    manager = NodeManager()
-    registry = {}
-    for node in manager.nodes:
-        registry.setdefault(node.address(), {})
-        registry[node.address()][node.__version__] = node
-    return registry
+    """The current registry, replaced when the manager reloads its sources."""
+    return get_node_manager().registry()
@@ -1,4 +1,5 @@
-import jsonsubschema
+from nodes.cache import result_cache, MISSING
+from nodes.compatibility import compatibility_cache, schema_hash
 from nodes.errors import UnhandledNodeError
 from abc import ABC, abstractmethod
 from pydantic_core import ValidationError, core_schema
@@ -13,13 +14,35 @@ from pydantic import (
     ValidationError,
 )
 from pydantic.fields import FieldInfo
-from typing import Annotated, Generic, Type, TypeVar, Any, Literal, Optional
-from inspect import signature, _empty, Parameter
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Callable,
+    Generic,
+    Type,
+    TypeVar,
+    Any,
+    Literal,
+    Optional,
+)
+from inspect import signature, _empty, Parameter, iscoroutine, iscoroutinefunction
 from dataclasses import dataclass
+from functools import cached_property
+from copy import deepcopy
 from shortuuid import uuid
 from logging import getLogger
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+import asyncio
+import os
+import sys
+import hashlib
 import json
 
+if TYPE_CHECKING:
+    from nodes.catalog import NodeCatalog
+
 logger = getLogger(__name__)
 
 T = TypeVar("T")
@@ -68,6 +91,75 @@ class EdgeSchema(BaseModel):
     IsSubset: bool
 
 
+@dataclass(frozen=True)
+class NodeDataSpec:
+    """The parts of a NodeData that only depend on the node class.  Building the
+    TypeAdapter compiles a core schema, so specs are built once per node class
+    and shared by every instance."""
+
+    key: str
+    model: Any
+    type: NodeDataTypes
+    adapter: TypeAdapter
+    has_default: bool
+
+    @classmethod
+    def build(cls, key: str, model: Any, type: NodeDataTypes) -> "NodeDataSpec":
+        model = None if model is _empty else model
+        adapter = TypeAdapter(model)
+        try:
+            adapter.validate_python(NodeData._coerce_defaults(None, adapter))
+            has_default = True
+        except ValidationError:
+            has_default = False
+        return cls(key, model, type, adapter, has_default)
+
+    @cached_property
+    def json_schema(self) -> dict:
+        """Shared by every instance, must not be modified."""
+        return self.adapter.json_schema()
+
+    @cached_property
+    def schema_hash(self) -> str:
+        return schema_hash(self.json_schema)
+
+
+@dataclass(frozen=True)
+class NodeSignature:
+    """The classified parameters of a node's run method."""
+
+    options: dict[str, Parameter]
+    inputs: dict[str, Parameter]
+    data: dict[str, NodeDataSpec]
+
+    @classmethod
+    def build(cls, node: Type["Node"]) -> "NodeSignature":
+        sig = signature(node.run)
+        OptionClass = getattr(node, "Options", None)
+        options: dict[str, Parameter] = {}
+        inputs: dict[str, Parameter] = {}
+        for i, (key, param) in enumerate(sig.parameters.items()):
+            if i == 0 and param.name == "self":
+                continue
+            if OptionClass and param.annotation == OptionClass:
+                options[key] = param
+            else:
+                inputs[key] = param
+
+        data = {
+            **{
+                k: NodeDataSpec.build(k, v.annotation, "input")
+                for k, v in inputs.items()
+            },
+            **{
+                k: NodeDataSpec.build(k, v.annotation, "options")
+                for k, v in options.items()
+            },
+            "output": NodeDataSpec.build("output", sig.return_annotation, "output"),
+        }
+        return cls(options=options, inputs=inputs, data=data)
+
+
 class NodeData:
     def __init__(
         self,
@@ -76,17 +168,30 @@ class NodeData:
         model: BaseModel,
         type: NodeDataTypes,
         value=UNSET,
+        spec: NodeDataSpec | None = None,
     ) -> None:
-        self.key = key
-        self.model = None if model is _empty else model
-        self.type: NodeDataTypes = type
-        self.adapter: TypeAdapter = TypeAdapter(self.model)
+        self.spec: NodeDataSpec = spec or NodeDataSpec.build(key, model, type)
+        self.key = self.spec.key
+        self.model = self.spec.model
+        self.type: NodeDataTypes = self.spec.type
+        self.adapter: TypeAdapter = self.spec.adapter
         self._value = value
         self._set: bool = False
         self.node = node
         if value is not UNSET:
             self._set = True
-        self.set_default()
+        if self.spec.has_default:
+            self.set_default()
+        else:
+            logger.debug(f"Cannot set default for {self.type} Node Data {self.key}")
+
+    @property
+    def json_schema(self) -> dict:
+        return self.spec.json_schema
+
+    @property
+    def schema_hash(self) -> str:
+        return self.spec.schema_hash
 
     def set_default(self):
         try:
@@ -104,15 +209,22 @@ class NodeData:
             details = {
                 "msg": msg,
                 "title": e.title,
-                "schema": self.adapter.json_schema(),
+                "schema": self.json_schema,
             }
 
             e.add_note(json.dumps(details))
             raise e
 
+    def set_validated(self, value):
+        """Set a value that is already known to be valid, skipping validation."""
+        self._value = value
+        self._set = True
+
     def set(self, value):
         self._value = self.validate(value)
         self._set = True
+        if self.type == "options" and isinstance(self.node, Node):
+            self.node._options_changed(self)
 
     @property
     def value(self) -> Any:
@@ -147,12 +259,17 @@ class Node(ABC):
     __sub_group__: str | None = None
     __label__: str | None = None
     __version__: int = 0
+    __cacheable__: bool = False
+    """Deterministic nodes can set this to reuse the output of a previous call
+    with the same inputs and options, see `nodes.cache.result_cache`.  Outputs
+    of cacheable nodes are shared between calls and must not be modified."""
 
     def __repr__(self) -> str:
         return self.address()
 
     def __init__(self, id: str | None = None) -> None:
         self.id: str = id or uuid()
+        self._option_listeners: list[Callable[[NodeData], None]] = []
         self.options: dict[str, NodeData] = self._get_options()
         self.inputs: dict[str, NodeData] = self._get_inputs(self.options)
         self.output: NodeData = self._get_output()
@@ -163,6 +280,17 @@ class Node(ABC):
         }
         self.input_data: dict[str, NodeData] = {**self.inputs, **self.options}
 
+    def add_option_listener(self, listener: Callable[[NodeData], None]) -> None:
+        """Register a callback that is called whenever an option is set."""
+        self._option_listeners.append(listener)
+
+    def remove_option_listener(self, listener: Callable[[NodeData], None]) -> None:
+        self._option_listeners.remove(listener)
+
+    def _options_changed(self, data: NodeData) -> None:
+        for listener in self._option_listeners:
+            listener(data)
+
     @property
     def options_set(self) -> bool:
         return all([data.is_set for data in self.options.values()])
@@ -175,49 +303,43 @@ class Node(ABC):
         """
         return all(data.is_set for data in self.input_data.values())
 
+    @classmethod
+    def _signature(cls) -> NodeSignature:
+        """Signature introspection is cached in the class's own __dict__, so
+        subclasses never share their parent's signature."""
+        try:
+            return cls.__dict__["_node_signature"]
+        except KeyError:
+            sig = NodeSignature.build(cls)
+            setattr(cls, "_node_signature", sig)
+            return sig
+
     @classmethod
     def _get_option_params(cls) -> dict[str, Parameter]:
-        sig = signature(cls.run)
-        OptionClass = getattr(cls, "Options", None)
-        if not OptionClass:
-            return {}
-        params = {}
-        for i, (key, param) in enumerate(sig.parameters.items()):
-            if (
-                not (i == 0 and param.name == "self")
-                and param.annotation == OptionClass
-            ):
-                params[key] = param
-        return params
+        return dict(cls._signature().options)
 
     @classmethod
     def _get_input_params(cls) -> dict[str, Parameter]:
-        sig = signature(cls.run)
-        options = cls._get_option_params()
-        inputs = {}
-        for i, (key, param) in enumerate(sig.parameters.items()):
-            if not (i == 0 and param.name == "self") and key not in options:
-                inputs[key] = param
-        return inputs
+        return dict(cls._signature().inputs)
 
     def _get_options(self) -> dict[str, NodeData]:
-        params = self._get_option_params()
+        specs = self._signature().data
         return {
-            k: NodeData(self, k, v.annotation, type="options")
-            for k, v in params.items()
+            k: NodeData(self, k, v.annotation, type="options", spec=specs[k])
+            for k, v in self._signature().options.items()
         }
 
     def _get_inputs(self, options: dict[str, NodeData]) -> dict[str, NodeData]:
-        params = self._get_input_params()
+        specs = self._signature().data
         return {
-            k: NodeData(self, k, v.annotation, type="input")
-            for k, v in params.items()
+            k: NodeData(self, k, v.annotation, type="input", spec=specs[k])
+            for k, v in self._signature().inputs.items()
             if k not in options
         }
 
     def _get_output(self) -> NodeData:
-        sig = signature(self.run)
-        return NodeData(self, "output", sig.return_annotation, type="output")
+        spec = self._signature().data["output"]
+        return NodeData(self, "output", spec.model, type="output", spec=spec)
 
     @classmethod
     def address(cls):
@@ -234,13 +356,58 @@ class Node(ABC):
     @abstractmethod
     def run(self, input: BaseModel | None, options: BaseModel | None):
         """This method is called when the node is run. It is passed the input
-        data and should return a dict that will be passed to the next node."""
+        data and should return a dict that will be passed to the next node.
+        It may be defined as a coroutine function with `async def`."""
         raise NotImplementedError
 
     def call(self, **inputs) -> Any:  # run.__annotations__.get("return"):
         """This method is called by the system and should not be overridden.
         It inspects the signature of the run method and passes the correct
-        arguments to it."""
+        arguments to it.  Coroutine run methods are run to completion, which
+        blocks a running event loop the caller is on, use `acall` there."""
+        params = self._get_call_params(inputs)
+        key = self._result_key()
+        if key and (cached := result_cache.get(key)) is not MISSING:
+            self.output.set_validated(cached)
+            return self.output.value
+
+        try:
+            ret = self.run(**params)
+            if iscoroutine(ret):
+                ret = _run_coroutine(ret)
+        except Exception as e:
+            return self.error_handler(e)
+
+        self.output.set(ret)
+        if key:
+            result_cache.set(key, self.output.value)
+
+        return self.output.value
+
+    async def acall(self, **inputs) -> Any:
+        """The asynchronous counterpart of `call`. Coroutine run methods are
+        awaited, synchronous run methods are offloaded to a thread."""
+        params = self._get_call_params(inputs)
+        key = self._result_key()
+        if key and (cached := result_cache.get(key)) is not MISSING:
+            self.output.set_validated(cached)
+            return self.output.value
+
+        try:
+            if iscoroutinefunction(self.run):
+                ret = await self.run(**params)
+            else:
+                ret = await asyncio.to_thread(self.run, **params)
+        except Exception as e:
+            return self.error_handler(e)
+
+        self.output.set(ret)
+        if key:
+            result_cache.set(key, self.output.value)
+
+        return self.output.value
+
+    def _get_call_params(self, inputs: dict[str, Any]) -> dict[str, Any]:
         for key, value in inputs.items():
             if key in self.data:
                 self.data[key].set(value)
@@ -250,16 +417,25 @@ class Node(ABC):
                 f"Cannot Call Node: {self.label()} due to unset Inputs: {unset}"
             )
 
-        params = {k: v.value for k, v in self.input_data.items()}
+        return {k: v.value for k, v in self.input_data.items()}
 
+    def _result_key(self) -> tuple[str, int, str] | None:
+        """The result cache key for the current inputs and options, or None if
+        this node is not cacheable or its data cannot be serialized."""
+        if not self.__cacheable__:
+            return None
         try:
-            ret = self.run(**params)
+            data = {
+                k: v.adapter.dump_python(v.value, mode="json")
+                for k, v in self.input_data.items()
+            }
+            digest = hashlib.sha256(
+                json.dumps(data, sort_keys=True, default=str).encode()
+            ).hexdigest()
         except Exception as e:
-            return self.error_handler(e)
-
-        self.output.set(ret)
-
-        return self.output.value
+            logger.debug(f"Cannot compute result cache key for {self}: {e}")
+            return None
+        return self.address(), self.__version__, digest
 
     def error_handler(self, exception: Exception):
         """This method is called when an exception is raised in a node. It is
@@ -342,10 +518,7 @@ class Node(ABC):
         return TypeAdapter(Annotated[annotation, Field(..., description=description)]).json_schema()  # type: ignore
 
     @classmethod
-    def data_schema(
-        cls, data_values: dict[tuple[NodeDataTypes, str], Any] | None = None
-    ) -> dict[str, NodeDataSchema]:
-        data_values = data_values or {}
+    def _build_data_schema(cls) -> dict[str, NodeDataSchema]:
         output_schema = {("output", "output"): cls._get_return_schema()}
 
         input_params = cls._get_input_params()
@@ -362,55 +535,185 @@ class Node(ABC):
         data.update(options_schema)
         data.update(output_schema)
 
+        return {
+            key: NodeDataSchema(Type=type, Schema=schema)
+            for (type, key), schema in data.items()
+        }
+
+    @classmethod
+    def _cached_class_schema(cls) -> NodeSchema:
+        """The class schema is cached per (address, version), see `clear_schema_cache`.
+        The cached schema is shared and must not be modified."""
+        key = (cls.address(), cls.__version__)
+        schema = _class_schema_cache.get(key)
+        if schema is None:
+            schema = _class_schema_cache[key] = NodeSchema(
+                Address=cls.address(),
+                Label=cls.label(),
+                Group=cls.__group__,
+                SubGroup=cls.__sub_group__,
+                Version=cls.__version__,
+                Data=cls._build_data_schema(),
+                Description=cls.description(),
+            )
+        return schema
+
+    @classmethod
+    def data_schema(
+        cls, data_values: dict[tuple[NodeDataTypes, str], Any] | None = None
+    ) -> dict[str, NodeDataSchema]:
+        data_values = data_values or {}
         data_schema: dict[str, NodeDataSchema] = {}
-        for (type, key), schema in data.items():
-            if (type, key) in data_values:
+        for key, data in cls._cached_class_schema().Data.items():
+            if (data.Type, key) in data_values:
                 data_schema[key] = NodeDataSchema(
-                    Type=type, Schema=schema, Value=data_values[(type, key)]
+                    Type=data.Type,
+                    Schema=deepcopy(data.Schema),
+                    Value=data_values[(data.Type, key)],
                 )
             else:
-                data_schema[key] = NodeDataSchema(Type=type, Schema=schema)
+                data_schema[key] = NodeDataSchema(
+                    Type=data.Type, Schema=deepcopy(data.Schema)
+                )
 
         return data_schema
 
     @classmethod
     def class_schema(cls) -> NodeSchema:
         """Return the schema for the node."""
-        data_schema = cls.data_schema()
-        return NodeSchema(
-            Address=cls.address(),
-            Label=cls.label(),
-            Group=cls.__group__,
-            SubGroup=cls.__sub_group__,
-            Version=cls.__version__,
-            Data=data_schema,
-            Description=cls.description(),
-        )
+        return cls._cached_class_schema().model_copy(deep=True)
 
     def schema(self) -> NodeSchema:
         data_schema = {(k.type, k.key): k.value for k in self.data.values() if k.is_set}
         data_schema = self.data_schema(data_values=data_schema)
-        return NodeSchema(
-            Address=self.address(),
-            Label=self.label(),
-            Group=self.__group__,
-            SubGroup=self.__sub_group__,
-            Version=self.__version__,
-            Data=data_schema,
-            Description=self.description(),
+        return self._cached_class_schema().model_copy(update={"Data": data_schema})
+
+
+_class_schema_cache: dict[tuple[str, int], NodeSchema] = {}
+
+
+def clear_schema_cache(address: str | None = None) -> None:
+    """Forget cached class schemas, for every node or only for the given
+    address.  Must be called when node sources are reloaded."""
+    if address is None:
+        _class_schema_cache.clear()
+    else:
+        for key in [x for x in _class_schema_cache if x[0] == address]:
+            _class_schema_cache.pop(key, None)
+
+
+def _run_coroutine(coroutine) -> Any:
+    """Run a coroutine to completion from synchronous code.  Called from a
+    running event loop, e.g. by a synchronous function in an async route,
+    `asyncio.run` refuses, so the coroutine gets a loop in a worker thread."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+@contextmanager
+def syspath(path):
+    sys.path.insert(0, path)
+    yield
+    sys.path.remove(path)
+
+
+@dataclass(frozen=True)
+class NodeEntry:
+    """Where a node class is defined, enough to import it when first used."""
+
+    address: str
+    module: str
+    name: str
+    version: int
+    path: str | None = None  # Added to sys.path while importing, for files
+    file: str | None = None  # The file the class is defined in
+
+    @classmethod
+    def from_node(cls, node: Type[Node]) -> "NodeEntry":
+        module = sys.modules.get(node.__module__)
+        return cls(
+            node.address(),
+            node.__module__,
+            node.__name__,
+            node.__version__,
+            file=getattr(module, "__file__", None),
         )
 
+    def load(self) -> Type[Node]:
+        if self.path is None:
+            module = import_module(self.module)
+        else:
+            with syspath(self.path):
+                module = import_module(self.module)
+        node = getattr(module, self.name)
+        if node.__version__ != self.version:
+            logger.warning(
+                f"Node {self.address} was indexed as version {self.version} but is version {node.__version__}"
+            )
+        return node
+
 
 class NodeSource(ABC):
-    """"""
+    """A place nodes are loaded from.  Each source keeps an `index` of its nodes
+    by address; node classes are only imported when they are first used, or
+    when `nodes` is read.  Sources that support it keep their index in the
+    `catalog`, see `nodes.catalog.NodeCatalog`."""
 
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, catalog: "NodeCatalog | None" = None) -> None:
         self.source: str = source
-        self.nodes: set[Node] = set()
-        self.resolve_nodes()
+        self.catalog = catalog
+        self._nodes: set[Type[Node]] | None = None
+        self.files: list[str] = []  # Read to build the index, set by index_nodes
+        # Whether the index surely holds every node, set by index_nodes
+        self.complete = True
+        self.index: dict[str, NodeEntry] = self.index_nodes()
+        if not self.files:
+            self.files = sorted({x.file for x in self.index.values() if x.file})
+        self._stamps = self._stat_files()
+
+    def _stat_files(self) -> dict[str, tuple[int, int] | None]:
+        stamps: dict[str, tuple[int, int] | None] = {}
+        for filename in self.files:
+            try:
+                stat = os.stat(filename)
+                stamps[filename] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[filename] = None
+        return stamps
+
+    def changed(self) -> bool:
+        """Whether any file the index was built from changed since."""
+        return self._stat_files() != self._stamps
+
+    def unload(self) -> None:
+        """Forget the imported modules of this source so they are imported
+        again.  Classes already in use are unaffected."""
+        for module in {x.module for x in self.index.values()}:
+            sys.modules.pop(module, None)
+
+    @property
+    def nodes(self) -> set[Type[Node]]:
+        """Every node of the source, imported."""
+        if self._nodes is None:
+            self._nodes = set()
+            self.resolve_nodes()
+        return self._nodes
+
+    def index_nodes(self) -> dict[str, NodeEntry]:
+        """Index the nodes of this source by address.  By default the nodes are
+        resolved to do so, sources that can find them without importing them
+        should override this."""
+        return {node.address(): NodeEntry.from_node(node) for node in self.nodes}
+
+    def load(self, address: str) -> Type[Node]:
+        return self.index[address].load()
 
     @abstractmethod
-    def resolve_nodes(self) -> set[Node]:
+    def resolve_nodes(self) -> None:
         raise NotImplementedError
 
     def add(self, node: Node):
@@ -432,6 +735,9 @@ class Edge:
         )
 
     def is_sub_schema(self) -> bool:
-        return jsonsubschema.isSubschema(
-            self.target.adapter.json_schema(), self.source.adapter.json_schema()
+        return compatibility_cache.is_subschema(
+            self.target.json_schema,
+            self.source.json_schema,
+            self.target.schema_hash,
+            self.source.schema_hash,
         )
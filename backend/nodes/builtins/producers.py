@@ -10,6 +10,7 @@ class StringProducer(Node):
 
     __label__ = "String Producer"
     __group__ = "Producers"
+    __cacheable__ = True
 
     class Options(BaseModel):
         value: str = Field(..., description="The value to produce")
@@ -29,6 +30,7 @@ class IntProducer(Node):
 
     __label__ = "Integer Producer"
     __group__ = "Producers"
+    __cacheable__ = True
 
     class Options(BaseModel):
         value: int = Field(..., description="The value to produce")
@@ -44,6 +46,7 @@ class FloatProducer(Node):
 
     __label__ = "Float Producer"
     __group__ = "Producers"
+    __cacheable__ = True
 
     class Options(BaseModel):
         value: float = Field(..., description="The value to produce")
@@ -59,6 +62,7 @@ class BoolProducer(Node):
 
     __label__ = "Boolean Producer"
     __group__ = "Producers"
+    __cacheable__ = True
 
     class Options(BaseModel):
         value: bool = Field(..., description="The value to produce")
@@ -75,6 +79,7 @@ class MapProducer(Node):
 
     __label__ = "Map Producer"
     __group__ = "Producers"
+    __cacheable__ = True
 
     class Options(BaseModel):
         value: dict[str, PrimitiveType] = Field(..., description="The value to produce")
@@ -1,4 +1,3 @@
-import requests
 from nodes.base import Node
 from nodes.datatypes import Undefined
 from pydantic import BaseModel, Field
@@ -42,6 +41,8 @@ class HTTPGetRequest(Node):
         :param headers: Any headers. Should be passed in as an object, e.g. {"header1": "value1", "header2": "value2"}
         :return: The json response from the request
         """
+        import requests  # Imported on first use, it is slow to import
+
         response = requests.get(url, params=params, headers=headers)
         response.raise_for_status()
         return OutputHTTPGetRequest(
@@ -51,6 +52,8 @@ class HTTPGetRequest(Node):
         )
 
     def error_handler(self, exception: Exception) -> OutputHTTPGetRequest:
+        import requests
+
         if isinstance(exception, requests.exceptions.HTTPError) and exception.response:
             content = exception.response.json()
             if not content:
@@ -9,6 +9,7 @@ class StringConcat(Node):
 
     __label__ = "String Concatenation"
     __group__ = "Transforms"
+    __cacheable__ = True
 
     class Options(BaseModel):
         delimiter: str = Field("", description="inserted between the 2 input strings.")
@@ -24,6 +25,7 @@ class ToString(Node):
 
     __label__ = "To String"
     __group__ = "Transforms"
+    __cacheable__ = True
 
     def run(self, value: str | int | float | bool) -> str:
         return str(value)
@@ -0,0 +1,93 @@
+import os
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Generic, Hashable, Iterator, TypeVar
+
+__all__ = ["LRUCache", "MISSING", "result_cache"]
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+MISSING = object()
+
+RESULT_CACHE_SIZE = int(os.environ.get("NODES_RESULT_CACHE_SIZE", 1024))
+RESULT_CACHE_TTL = (
+    float(os.environ["NODES_RESULT_CACHE_TTL"])
+    if os.environ.get("NODES_RESULT_CACHE_TTL")
+    else None
+)
+
+
+class LRUCache(Generic[K, V]):
+    """A thread safe mapping that evicts the least recently used entry once it
+    holds more than `maxsize` entries, and entries older than `ttl` seconds when
+    a ttl is given.  Hits and misses are counted by `get`."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        assert maxsize > 0, "maxsize must be greater than 0"
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._expires: dict[K, float] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K, default=MISSING):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.ttl is not None and self._expires[key] <= monotonic():
+                del self._data[key]
+                del self._expires[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = monotonic() + self.ttl
+            while len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
+
+    def items(self) -> Iterator[tuple[K, V]]:
+        with self._lock:
+            return iter(list(self._data.items()))
+
+    def evict(self, predicate: Callable[[K], bool]) -> int:
+        """Remove the entries whose key matches, returns how many were removed."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+                self._expires.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+result_cache: LRUCache[tuple[str, int, str], Any] = LRUCache(
+    maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL
+)
+"""Outputs of nodes marked `__cacheable__`, keyed by node address, version and a
+hash of the validated inputs and options."""
@@ -0,0 +1,206 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from logging import getLogger
+from threading import Lock
+from typing import Any
+from pydantic import VERSION as PYDANTIC_VERSION
+from nodes.base import NodeEntry, NodeSchema
+
+logger = getLogger(__name__)
+
+__all__ = ["NodeCatalog", "node_catalog"]
+
+CATALOG_PATH = os.environ.get("NODES_CATALOG")
+CATALOG_VERSION = 3
+
+Fingerprint = tuple[int, int, str]  # (mtime in ns, size, sha256 of the content)
+
+
+class NodeCatalog:
+    """Records the index of each node source and the class schemas of its
+    nodes, keyed by the modification time and content hash of every file the
+    index was read from.  Unchanged sources are neither parsed nor imported to
+    list their nodes or serve their schemas.  A node's schema may depend on any
+    file of its source, e.g. one defining a base class, so a changed file
+    invalidates everything recorded for the sources that read it.
+
+    Without a `path` nothing is recorded.  Otherwise the catalog is loaded from
+    that file and written back to it when the process exits.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._sources: dict[str, dict[str, Any]] = {}
+        self._fingerprints: dict[str, Fingerprint | None] = {}
+        self._dirty = False
+        self._lock = Lock()
+        if path:
+            self.load(path)
+            atexit.register(self.save)
+
+    @staticmethod
+    def _version() -> str:
+        """Schemas are only reusable with the same pydantic."""
+        return f"{CATALOG_VERSION}:{PYDANTIC_VERSION}"
+
+    def fingerprint(self, filename: str) -> Fingerprint | None:
+        """The current fingerprint of a file, checked once per process, see
+        `forget_fingerprints`.  Content is only hashed when the modification
+        time or size differs from the recorded one."""
+        try:
+            return self._fingerprints[filename]
+        except KeyError:
+            pass
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            fingerprint = None
+        else:
+            recorded = self._recorded_fingerprint(filename)
+            if recorded is not None and recorded[:2] == (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                fingerprint = recorded
+            else:
+                with open(filename, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                fingerprint = (stat.st_mtime_ns, stat.st_size, digest)
+        self._fingerprints[filename] = fingerprint
+        return fingerprint
+
+    def _recorded_fingerprint(self, filename: str) -> Fingerprint | None:
+        for source in self._sources.values():
+            if filename in source["files"]:
+                return tuple(source["files"][filename])  # type: ignore
+        return None
+
+    def _is_current(self, filename: str, recorded: list | tuple) -> bool:
+        current = self.fingerprint(filename)
+        # A touched but unchanged file only differs in modification time
+        return current is not None and current[2] == recorded[2]
+
+    def forget_fingerprints(self) -> None:
+        """Check files for changes again, e.g. before reloading sources."""
+        self._fingerprints.clear()
+
+    def _current_record(self, source: str) -> dict[str, Any] | None:
+        record = self._sources.get(source)
+        if record is None or not all(
+            self._is_current(filename, fingerprint)
+            for filename, fingerprint in record["files"].items()
+        ):
+            return None
+        return record
+
+    def get_index(self, source: str) -> dict[str, NodeEntry] | None:
+        if not self.path:
+            return None
+        record = self._current_record(source)
+        if record is None:
+            return None
+        entries = [NodeEntry(**x) for x in record["entries"]]
+        return {entry.address: entry for entry in entries}
+
+    def files(self, source: str) -> list[str]:
+        """The files the recorded index of a source was read from."""
+        record = self._sources.get(source)
+        return [] if record is None else list(record["files"])
+
+    def is_complete(self, source: str) -> bool:
+        """Whether the recorded index of a source holds every node."""
+        record = self._sources.get(source)
+        return record is not None and record.get("complete", False)
+
+    def put_index(
+        self,
+        source: str,
+        files: list[str],
+        index: dict[str, NodeEntry],
+        complete: bool = True,
+    ) -> None:
+        if not self.path:
+            return
+        fingerprints = {x: self.fingerprint(x) for x in files}
+        if any(x is None for x in fingerprints.values()):
+            return
+        with self._lock:
+            self._sources[source] = {
+                "files": {k: list(v) for k, v in fingerprints.items()},  # type: ignore
+                "entries": [asdict(x) for x in index.values()],
+                "complete": complete,
+                "schemas": {},
+            }
+            self._dirty = True
+
+    def get_schema(self, source: str, entry: NodeEntry) -> NodeSchema | None:
+        if not self.path:
+            return None
+        record = self._current_record(source)
+        if record is None:
+            return None
+        schema = record["schemas"].get(f"{entry.address}:{entry.version}")
+        return None if schema is None else NodeSchema.model_validate(schema)
+
+    def put_schema(self, source: str, entry: NodeEntry, schema: NodeSchema) -> None:
+        """Record a schema, unless the source changed since it was indexed."""
+        if not self.path:
+            return
+        with self._lock:
+            record = self._current_record(source)
+            if record is None:
+                return
+            record["schemas"][f"{entry.address}:{entry.version}"] = schema.model_dump(
+                mode="json"
+            )
+            self._dirty = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sources.clear()
+            self._fingerprints.clear()
+            self._dirty = True
+
+    def load(self, path: str | None = None) -> None:
+        path = path or self.path
+        if not path or not os.path.isfile(path):
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unable to load node catalog from {path}: {e}")
+            return
+        if data.get("version") != self._version():
+            logger.info(f"Discarding node catalog {path}, version mismatch")
+            return
+        self._sources = data.get("sources", {})
+
+    def save(self, path: str | None = None) -> None:
+        path = path or self.path
+        if not path or not self._dirty:
+            return
+        with self._lock:
+            data = {
+                "version": self._version(),
+                "sources": self._sources,
+            }
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            # A file of our own, other processes may be saving concurrently
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._dirty = False
+
+
+node_catalog = NodeCatalog(path=CATALOG_PATH)
@@ -0,0 +1,128 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+from copy import deepcopy
+from importlib.metadata import version, PackageNotFoundError
+from logging import getLogger
+from threading import Lock
+from nodes.cache import LRUCache, MISSING
+from nodes.patches import get_jsonsubschema, __patch_version__
+
+logger = getLogger(__name__)
+
+__all__ = ["SchemaCompatibilityCache", "compatibility_cache", "schema_hash"]
+
+CACHE_SIZE = int(os.environ.get("NODES_COMPATIBILITY_CACHE_SIZE", 4096))
+CACHE_PATH = os.environ.get("NODES_COMPATIBILITY_CACHE")
+
+
+def schema_hash(schema: dict) -> str:
+    """A hash of the canonical json representation of a schema"""
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SchemaCompatibilityCache:
+    """Caches the results of `jsonsubschema.isSubschema` keyed on the hashes of
+    both schemas.  Canonicalising schemas is very slow, so every pair of
+    schemas should only ever be checked once per process.
+
+    When `path` is set the cache is loaded from that file and written back to it
+    when the process exits, if new results were added.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE, path: str | None = None) -> None:
+        self.path = path
+        self._cache: LRUCache[tuple[str, str], bool] = LRUCache(maxsize)
+        self._dirty = False
+        self._lock = Lock()  # Keeps `_dirty` in step with the cache
+        if path:
+            self.load(path)
+            atexit.register(self.save)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def is_subschema(
+        self,
+        sub: dict,
+        sup: dict,
+        sub_hash: str | None = None,
+        sup_hash: str | None = None,
+    ) -> bool:
+        """Return whether `sub` is a subschema of `sup`.  Precomputed hashes of
+        the schemas may be passed to avoid hashing them again."""
+        key = (sub_hash or schema_hash(sub), sup_hash or schema_hash(sup))
+        result = self._cache.get(key)
+        if result is MISSING:
+            # jsonsubschema may modify the schemas it is given.
+            result = get_jsonsubschema().isSubschema(deepcopy(sub), deepcopy(sup))
+            with self._lock:
+                self._cache.set(key, result)
+                self._dirty = True
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._dirty = True
+
+    @staticmethod
+    def _version() -> str:
+        """Results are only reusable with the same jsonsubschema and patches."""
+        try:
+            jsonsubschema_version = version("jsonsubschema")
+        except PackageNotFoundError:
+            jsonsubschema_version = "unknown"
+        return f"{jsonsubschema_version}:{__patch_version__}"
+
+    def load(self, path: str | None = None) -> None:
+        path = path or self.path
+        if not path or not os.path.isfile(path):
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unable to load compatibility cache from {path}: {e}")
+            return
+        if data.get("version") != self._version():
+            logger.info(f"Discarding compatibility cache {path}, version mismatch")
+            return
+        for sub_hash, sup_hash, result in data.get("entries", []):
+            self._cache.set((sub_hash, sup_hash), result)
+
+    def save(self, path: str | None = None) -> None:
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = [[sub, sup, x] for (sub, sup), x in self._cache.items()]
+            self._dirty = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # A file of our own, other processes may be saving concurrently
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": self._version(), "entries": entries}, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            self._dirty = True
+            raise
+
+
+compatibility_cache = SchemaCompatibilityCache(path=CACHE_PATH)
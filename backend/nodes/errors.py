@@ -12,6 +12,24 @@ class UnhandledNodeError(NodeError):
     pass
 
 
+class WorkflowCycleException(NodeError):
+    """Raised when the edges of a workflow form a cycle and no execution order
+    exists."""
+
+    def __init__(self, message: str, cycle: list, *args: object) -> None:
+        super().__init__(message, *args)
+        self.cycle = cycle
+
+
+class WorkflowEdgeConflictException(NodeError):
+    """Raised when more than one edge leads into the same node input.  An input
+    may only have one edge."""
+
+    def __init__(self, message: str, edges: list, *args: object) -> None:
+        super().__init__(message, *args)
+        self.edges = edges
+
+
 class NodeDataException(Exception):
     """"""
 
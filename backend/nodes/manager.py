@@ -1,22 +1,38 @@
+import ast
+import importlib
 import os
-from nodes.base import Node, NodeSource
+import sys
+from nodes.base import (
+    Node,
+    NodeEntry,
+    NodeSchema,
+    NodeSource,
+    clear_schema_cache,
+    syspath,
+)
+from nodes.cache import result_cache
+from nodes.catalog import NodeCatalog, node_catalog
+from concurrent.futures import ThreadPoolExecutor, wait
 from importlib import import_module
+from importlib.machinery import PathFinder
+from importlib.metadata import entry_points
+from importlib.util import find_spec
 from inspect import getmembers, isclass
 from logging import getLogger
-from contextlib import contextmanager
+from threading import RLock
+from time import perf_counter
+from typing import Iterable, Iterator, Mapping, Type
 
 logger = getLogger(__name__)
 
-__all__ = ["NodeManager"]
+__all__ = ["NodeManager", "NodeRegistry", "NodeVersions", "discover_sources"]
 
-
-@contextmanager
-def syspath(path):
-    import sys
-
-    sys.path.insert(0, path)
-    yield
-    sys.path.remove(path)
+SOURCES_ENTRY_POINT = "nodes.sources"
+# Extra sources, module names or files separated by os.pathsep
+NODES_SOURCES = os.environ.get("NODES_SOURCES", "")
+SOURCES_MAX_WORKERS = int(os.environ.get("NODES_SOURCES_MAX_WORKERS", 8))
+# Seconds to wait for sources at startup, slower ones are added when done
+SOURCES_TIMEOUT = float(os.environ.get("NODES_SOURCES_TIMEOUT", 10))
 
 
 def _is_node_class(member):
@@ -28,7 +44,346 @@ def _is_node_class(member):
     )
 
 
-class Module(NodeSource):
+def _find_module_file(directory: str, parts: list[str]) -> tuple[str, bool] | None:
+    """The file, and whether it is a package, of a module in `directory`."""
+    path = os.path.join(directory, *parts)
+    if os.path.isfile(os.path.join(path, "__init__.py")):
+        return os.path.join(path, "__init__.py"), True
+    if os.path.isfile(f"{path}.py"):
+        return f"{path}.py", False
+    return None
+
+
+def _dotted_name(base: ast.expr) -> list[str] | None:
+    """The parts of a base class expression, e.g. `["base", "Node"]`."""
+    if isinstance(base, ast.Name):
+        return [base.id]
+    if isinstance(base, ast.Attribute):
+        value = _dotted_name(base.value)
+        return None if value is None else [*value, base.attr]
+    if isinstance(base, ast.Subscript):  # Generic bases, e.g. Base[T]
+        return _dotted_name(base.value)
+    return None
+
+
+def _locate_module(module: str, path: list[str] | None) -> tuple[str, bool] | None:
+    """The file, and whether it is a package, of a module, without importing
+    it or its parent packages."""
+    spec = None
+    parts = module.split(".")
+    for i in range(len(parts)):
+        spec = PathFinder.find_spec(".".join(parts[: i + 1]), path)
+        if spec is None:
+            return None
+        path = spec.submodule_search_locations
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    return spec.origin, spec.submodule_search_locations is not None
+
+
+def _class_version(node: ast.ClassDef) -> int | None:
+    for statement in node.body:
+        if (
+            isinstance(statement, (ast.Assign, ast.AnnAssign))
+            and any(
+                isinstance(target, ast.Name) and target.id == "__version__"
+                for target in (
+                    statement.targets
+                    if isinstance(statement, ast.Assign)
+                    else [statement.target]
+                )
+            )
+            and isinstance(statement.value, ast.Constant)
+            and isinstance(statement.value.value, int)
+        ):
+            return statement.value.value
+    return None
+
+
+def _statements(body: list[ast.stmt]) -> Iterator[ast.stmt]:
+    """The statements of a module body, including those of top-level `if`,
+    `try` and `with` blocks, which may import or define nodes too."""
+    for statement in body:
+        if isinstance(statement, ast.If):
+            yield from _statements(statement.body)
+            yield from _statements(statement.orelse)
+        elif isinstance(statement, (ast.Try, ast.TryStar)):
+            yield from _statements(statement.body)
+            for handler in statement.handlers:
+                yield from _statements(handler.body)
+            yield from _statements(statement.orelse)
+            yield from _statements(statement.finalbody)
+        elif isinstance(statement, (ast.With, ast.AsyncWith)):
+            yield from _statements(statement.body)
+        else:
+            yield statement
+
+
+def _defines_dynamic_classes(tree: ast.Module) -> bool:
+    """Whether a module may define classes the parser cannot see: ones defined
+    in a function, e.g. a factory, or built by calling `type`."""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if any(isinstance(x, ast.ClassDef) for x in ast.walk(node)):
+                return True
+        elif (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id == "type"
+            and len(node.args) == 3
+        ):
+            return True
+    return False
+
+
+_NODE = NodeEntry("nodes.base.Node", "nodes.base", "Node", 0)
+_NODE_MODULES = {"nodes", "nodes.base"}  # Modules that export Node itself
+
+# What a module defines: the node classes by name, the names imported from
+# modules outside the source as (module, name), and the names in `__all__`
+_ModuleIndex = tuple[dict[str, NodeEntry], dict[str, tuple[str, str]], list[str] | None]
+
+
+class _SourceIndexer:
+    """Finds the node classes of a module by parsing its source, without
+    importing it.  Imports from modules of the same package, relative or
+    absolute, are followed so re-exported nodes are found too.
+
+    A class is a node if it derives from `Node`, or from a node class found in
+    the same source.  Bases imported from other modules, for example a builtin
+    node or an alias of `Node`, are looked up by parsing those modules too.
+    Nodes that the parser cannot see, for example ones built dynamically, are
+    still found when the source is fully resolved.  `complete` is false when
+    the source may define such nodes, or nodes only defined conditionally.
+    """
+
+    def __init__(
+        self, root: str, filename: str, is_package: bool, path: str | None = None
+    ) -> None:
+        self.root = root
+        self.root_file = filename
+        self.root_is_package = is_package
+        self.path = path
+        self._modules: dict[str, _ModuleIndex] = {}
+        self.files: list[str] = []  # Every file read, for the catalog
+        self.complete = True
+
+    def index(self) -> dict[str, NodeEntry]:
+        namespace, _, _ = self._index_module(
+            self.root, self.root_file, self.root_is_package
+        )
+        return {
+            entry.address: entry for entry in namespace.values() if entry is not _NODE
+        }
+
+    def _index_module(
+        self, module: str, filename: str, is_package: bool, external: bool = False
+    ) -> _ModuleIndex:
+        if module in self._modules:
+            return self._modules[module]
+        self._modules[module] = ({}, {}, None)  # Guards against import cycles
+        self.files.append(filename)
+        with open(filename, "rb") as f:
+            tree = ast.parse(f.read(), filename)
+        if not external and _defines_dynamic_classes(tree):
+            self.complete = False
+        package = module if is_package else module.rpartition(".")[0]
+        package_dir = os.path.dirname(filename)
+        namespace: dict[str, NodeEntry] = {}
+        imports: dict[str, tuple[str, str]] = {}
+        modules: dict[str, str] = {}  # Names bound by `import x.y [as z]`
+        public: list[str] | None = None
+        for statement in _statements(tree.body):
+            if isinstance(statement, ast.ImportFrom):
+                target = self._resolve_import(statement, package, package_dir)
+                if target is None:
+                    if statement.module and not statement.level:
+                        imports.update(
+                            (x.asname or x.name, (statement.module, x.name))
+                            for x in statement.names
+                            if x.name != "*"
+                        )
+                    continue
+                imported, imported_imports, imported_public = self._index_module(
+                    *target, external
+                )
+                for alias in statement.names:
+                    if alias.name == "*":
+
+                        def exported(name: str) -> bool:
+                            if imported_public is not None:
+                                return name in imported_public
+                            return not name.startswith("_")
+
+                        namespace.update(x for x in imported.items() if exported(x[0]))
+                        imports.update(
+                            x for x in imported_imports.items() if exported(x[0])
+                        )
+                    elif alias.name in imported:
+                        namespace[alias.asname or alias.name] = imported[alias.name]
+                    elif alias.name in imported_imports:
+                        imports[alias.asname or alias.name] = imported_imports[
+                            alias.name
+                        ]
+            elif isinstance(statement, ast.Import):
+                for alias in statement.names:
+                    if alias.asname:
+                        modules[alias.asname] = alias.name
+                    else:
+                        name = alias.name.partition(".")[0]
+                        modules[name] = name
+            elif isinstance(statement, ast.ClassDef):
+                node_bases = [
+                    base
+                    for base in (
+                        self._resolve_base(x, namespace, imports, modules)
+                        for x in statement.bases
+                    )
+                    if base is not None
+                ]
+                if not external and statement not in tree.body:
+                    self.complete = False  # Conditionally defined
+                if node_bases:
+                    version = _class_version(statement)
+                    if version is None:
+                        version = node_bases[0].version
+                    namespace[statement.name] = NodeEntry(
+                        f"{module}.{statement.name}",
+                        module,
+                        statement.name,
+                        version,
+                        self.path,
+                        filename,
+                    )
+                else:
+                    namespace.pop(statement.name, None)
+            elif isinstance(statement, ast.Assign) and any(
+                isinstance(x, ast.Name) and x.id == "__all__" for x in statement.targets
+            ):
+                try:
+                    public = list(ast.literal_eval(statement.value))
+                except ValueError:
+                    public = None
+        if module == _NODE.module:
+            namespace["Node"] = _NODE
+        self._modules[module] = (namespace, imports, public)
+        return self._modules[module]
+
+    def _resolve_base(
+        self,
+        base: ast.expr,
+        namespace: dict[str, NodeEntry],
+        imports: dict[str, tuple[str, str]],
+        modules: dict[str, str],
+    ) -> NodeEntry | None:
+        """The node a base class expression refers to, if it is one."""
+        parts = _dotted_name(base)
+        if parts is None:
+            return None
+        entry = None
+        if len(parts) == 1:
+            if parts[0] in namespace:
+                return namespace[parts[0]]
+            if parts[0] in imports:
+                entry = self._resolve_external(*imports[parts[0]])
+        elif parts[0] in modules:
+            module = ".".join([modules[parts[0]], *parts[1:-1]])
+            entry = self._resolve_external(module, parts[-1])
+        if entry is None and parts[-1] == "Node":
+            return _NODE  # E.g. star imported, assume it is nodes.base.Node
+        return entry
+
+    def _resolve_external(
+        self, module: str, name: str, seen: frozenset = frozenset()
+    ) -> NodeEntry | None:
+        """Look up a name imported from a module outside the source."""
+        if module in _NODE_MODULES and name == "Node":
+            return _NODE
+        if (module, name) in seen:
+            return None
+        located = _locate_module(module, [self.path, *sys.path] if self.path else None)
+        if located is None:
+            return None
+        try:
+            namespace, imports, _ = self._index_module(module, *located, True)
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.debug(f"Unable to index module {module}: {e}")
+            return None
+        if name in namespace:
+            return namespace[name]
+        if name in imports:
+            return self._resolve_external(*imports[name], seen | {(module, name)})
+        return None
+
+    def _resolve_import(
+        self, statement: ast.ImportFrom, package: str, package_dir: str
+    ) -> tuple[str, str, bool] | None:
+        rest = statement.module.split(".") if statement.module else []
+        if statement.level:
+            parts = package.split(".") if package else []
+            up = statement.level - 1
+            if up > len(parts) or (up == len(parts) and not rest):
+                return None
+            directory = package_dir
+            for _ in range(up):
+                directory = os.path.dirname(directory)
+            module = ".".join(parts[: len(parts) - up] + rest)
+        else:
+            module = statement.module or ""
+            if module == self.root:
+                return module, self.root_file, self.root_is_package
+            if not (self.root_is_package and module.startswith(f"{self.root}.")):
+                return None
+            directory = os.path.dirname(self.root_file)
+            rest = module[len(self.root) + 1 :].split(".")
+        if not rest:
+            return module, os.path.join(directory, "__init__.py"), True
+        located = _find_module_file(directory, rest)
+        if located is None:
+            return None
+        return module, *located
+
+
+class _ParsedSource(NodeSource):
+    """A source indexed by parsing its files.  The index is kept in the catalog
+    and only parsed again when one of those files changes."""
+
+    def _index(
+        self, root: str, filename: str, is_package: bool, path: str | None = None
+    ) -> dict[str, NodeEntry]:
+        if self.catalog is not None:
+            index = self.catalog.get_index(self.source)
+            if index is not None:
+                self.files = self.catalog.files(self.source)
+                self.complete = self.catalog.is_complete(self.source)
+                return index
+        indexer = _SourceIndexer(root, filename, is_package, path)
+        index = indexer.index()
+        self.files = indexer.files
+        self.complete = indexer.complete and bool(index)
+        if self.catalog is not None:
+            self.catalog.put_index(self.source, indexer.files, index, self.complete)
+        return index
+
+
+class Module(_ParsedSource):
+    def index_nodes(self) -> dict[str, NodeEntry]:
+        spec = find_spec(self.source)
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            return super().index_nodes()
+        is_package = spec.submodule_search_locations is not None
+        try:
+            return self._index(self.source, spec.origin, is_package)
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.warning(f"Unable to index module {self.source}, importing it: {e}")
+            return super().index_nodes()
+
+    def unload(self) -> None:
+        super().unload()
+        for module in [x for x in sys.modules if x.startswith(f"{self.source}.")]:
+            sys.modules.pop(module, None)
+        sys.modules.pop(self.source, None)
+
     def resolve_nodes(self) -> None:
         logger.debug(f"Resolving nodes from module {self.source}")
         module = import_module(self.source)
@@ -38,7 +393,22 @@ class Module(NodeSource):
             self.add(node)
 
 
-class File(NodeSource):
+class File(_ParsedSource):
+    def index_nodes(self) -> dict[str, NodeEntry]:
+        if not self.source.endswith(".py"):
+            return {}
+        dirname = os.path.dirname(self.source)
+        module_name = os.path.splitext(os.path.basename(self.source))[0]
+        try:
+            return self._index(module_name, self.source, False, dirname)
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.warning(f"Unable to index file {self.source}, importing it: {e}")
+            return super().index_nodes()
+
+    def unload(self) -> None:
+        super().unload()
+        sys.modules.pop(os.path.splitext(os.path.basename(self.source))[0], None)
+
     def resolve_nodes(self) -> None:
         if self.source.endswith(".py"):
             logger.debug(f"Resolving nodes from file {self.source}")
@@ -53,41 +423,252 @@ class File(NodeSource):
                     self.add(node)
 
 
-def source_factory(source: str) -> NodeSource:
+def source_factory(source: str, catalog: NodeCatalog | None = None) -> NodeSource:
     if os.path.isfile(source):
-        return File(source)
+        return File(source, catalog)
     else:
-        return Module(source)
+        return Module(source, catalog)
+
+
+def discover_sources() -> list[str]:
+    """The default sources, then those registered by installed packages under
+    the `nodes.sources` entry point group, then those listed in NODES_SOURCES."""
+    sources = list(NodeManager.DEFAULT_SOURCES)
+    sources.extend(x.module for x in entry_points(group=SOURCES_ENTRY_POINT))
+    sources.extend(x for x in NODES_SOURCES.split(os.pathsep) if x)
+    return list(dict.fromkeys(sources))
+
+
+class NodeVersions(Mapping[int, Type[Node]]):
+    """The versions of a node address.  Each is imported when first accessed,
+    schemas are read from the catalog when the node is unchanged."""
+
+    def __init__(self, catalog: NodeCatalog | None = None) -> None:
+        self._catalog = catalog
+        self._entries: dict[int, NodeEntry | Type[Node]] = {}
+        self._sources: dict[int, str] = {}  # The source each entry is from
+        self._loaded: dict[int, Type[Node]] = {}
+
+    def __getitem__(self, version: int) -> Type[Node]:
+        if version not in self._loaded:
+            entry = self._entries[version]
+            self._loaded[version] = (
+                entry.load() if isinstance(entry, NodeEntry) else entry
+            )
+        return self._loaded[version]
+
+    def schema(self, version: int) -> NodeSchema:
+        entry = self._entries[version]
+        source = self._sources.get(version)
+        if source is None or not isinstance(entry, NodeEntry) or not self._catalog:
+            return self[version].class_schema()
+        schema = self._catalog.get_schema(source, entry)
+        if schema is None:
+            schema = self[version].class_schema()
+            self._catalog.put_schema(source, entry, schema)
+        return schema
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NodeRegistry(Mapping[str, NodeVersions]):
+    """Every node of a manager by address and version, built from the indexes
+    of its sources so no node is imported until it is used.  Sources whose
+    index may be incomplete, or is empty, are resolved to find the rest."""
+
+    def __init__(self, manager: "NodeManager") -> None:
+        self._catalog = manager.catalog
+        self._nodes: dict[str, NodeVersions] = {}
+        for source in manager.sources:
+            for address, entry in source.index.items():
+                self._add(address, entry.version, entry, source.source)
+            if not source.complete:
+                # The index may miss nodes, e.g. ones made by a factory
+                for node in source.nodes:
+                    address = node.address()
+                    if node.__version__ not in self._nodes.get(address, {}):
+                        self._add(address, node.__version__, node)
+        for node in manager._nodes:
+            self._add(node.address(), node.__version__, node)
+
+    def _add(
+        self,
+        address: str,
+        version: int,
+        node: NodeEntry | Type[Node],
+        source: str | None = None,
+    ):
+        versions = self._nodes.setdefault(address, NodeVersions(self._catalog))
+        versions._entries[version] = node
+        if source is None:
+            versions._sources.pop(version, None)
+        else:
+            versions._sources[version] = source
+
+    def schemas(self) -> dict[str, NodeSchema]:
+        """The class schema of every node by `address:version`.  Nodes of
+        unchanged sources are served from the catalog without importing them,
+        new schemas are recorded in it to be saved when the process exits."""
+        return {
+            f"{address}:{version}": versions.schema(version)
+            for address, versions in self._nodes.items()
+            for version in versions
+        }
+
+    def __getitem__(self, address: str) -> NodeVersions:
+        return self._nodes[address]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
 
 
 class NodeManager:
+    """The node sources and nodes available to workflows.  `reload` picks up
+    changed sources without restarting, swapping in a new registry; nodes
+    already in use keep the classes they were created from."""
+
     DEFAULT_SOURCES = ["nodes.builtins"]
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        catalog: NodeCatalog | None = node_catalog,
+        sources: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        self.catalog = catalog
         self._sources: set[NodeSource] = set()
-        self._nodes: set[Node] = set()
+        self._nodes: set[Type[Node]] = set()
+        # Maintained by add_source and add_node
+        self._by_address: dict[str, NodeSource | Type[Node]] = {}
+        self._resolved = False
+        self._registry: NodeRegistry | None = None
+        self._lock = RLock()
 
-        for source in self.DEFAULT_SOURCES:
-            self.add_source(source)
+        self.add_sources(self.DEFAULT_SOURCES if sources is None else sources, timeout)
 
     @property
     def sources(self) -> set[NodeSource]:
-        return self._sources
+        """A snapshot, sources still loading may be added at any time."""
+        with self._lock:
+            return set(self._sources)
 
     @property
-    def nodes(self) -> set[Node]:
-        return {node for source in self._sources for node in source.nodes}.union(
-            self._nodes
-        )
+    def nodes(self) -> set[Type[Node]]:
+        """Every node, importing every source."""
+        with self._lock:
+            sources, nodes = list(self._sources), set(self._nodes)
+        return {node for source in sources for node in source.nodes}.union(nodes)
+
+    def get_node_by_id(self, id: str) -> Type[Node]:
+        by_address = self._by_address
+        if id not in by_address and not self._resolved:
+            # The index may miss nodes the parser cannot see, import them once
+            for node in self.nodes:
+                by_address.setdefault(node.address(), node)
+            self._resolved = True
+        try:
+            node = by_address[id]
+        except KeyError:
+            raise ValueError(f"Node with id {id} not found") from None
+        return node.load(id) if isinstance(node, NodeSource) else node
 
-    def get_node_by_id(self, id: str) -> Node:
-        for node in self.nodes:
-            if node.address() == id:
-                return node
-        raise ValueError(f"Node with id {id} not found")
+    def registry(self) -> NodeRegistry:
+        """The registry of the current sources, rebuilt when they change."""
+        registry = self._registry
+        if registry is None:
+            with self._lock:
+                registry = self._registry = self._registry or NodeRegistry(self)
+        return registry
 
     def add_source(self, source: str) -> None:
-        self._sources.add(source_factory(source))
+        node_source = source_factory(source, self.catalog)
+        with self._lock:
+            self._sources.add(node_source)
+            self._index_source(node_source, self._by_address)
+            self._resolved = False
+            self._registry = None
+
+    def add_sources(
+        self, sources: Iterable[str], timeout: float | None = None
+    ) -> dict[str, float]:
+        """Add sources concurrently, so a slow or broken source does not hold up
+        the others.  Sources that fail are logged and skipped, sources still
+        loading after `timeout` seconds are added when they are done.  Returns
+        the seconds each source added in time took."""
+        executor = ThreadPoolExecutor(
+            max_workers=SOURCES_MAX_WORKERS, thread_name_prefix="node-sources"
+        )
+        futures = [executor.submit(self._timed_add_source, x) for x in sources]
+        done, pending = wait(futures, timeout=timeout)
+        executor.shutdown(wait=False)
+        if pending:
+            logger.warning(
+                f"{len(pending)} node sources still loading after {timeout}s"
+            )
+        return dict(x.result() for x in done if x.result() is not None)
+
+    def _timed_add_source(self, source: str) -> tuple[str, float] | None:
+        start = perf_counter()
+        try:
+            self.add_source(source)
+        except Exception as e:
+            logger.exception(f"Unable to load node source {source}: {e}")
+            return None
+        elapsed = perf_counter() - start
+        logger.info(f"Loaded node source {source} in {elapsed:.3f}s")
+        return source, elapsed
+
+    def add_node(self, node: Type[Node]):
+        with self._lock:
+            self._nodes.add(node)
+            self._by_address[node.address()] = node
+            self._registry = None
+
+    @staticmethod
+    def _index_source(
+        source: NodeSource, by_address: dict[str, NodeSource | Type[Node]]
+    ) -> None:
+        for address in source.index:
+            by_address.setdefault(address, source)
+
+    def reload(self) -> list[str]:
+        """Re-index and unload the sources whose files changed, so their nodes
+        are imported again when next used, and swap in a registry built from
+        them.  Returns the reloaded sources."""
+        with self._lock:
+            if self.catalog is not None:
+                self.catalog.forget_fingerprints()
+            changed = [x for x in self._sources if x.changed()]
+            if not changed:
+                return []
+            sources = self._sources.difference(changed)
+            for source in changed:
+                logger.info(f"Reloading node source {source.source}")
+                source.unload()
+            importlib.invalidate_caches()
+            reloaded = [source_factory(x.source, self.catalog) for x in changed]
+            sources.update(reloaded)
+
+            by_address: dict[str, NodeSource | Type[Node]] = {}
+            for source in sources:
+                self._index_source(source, by_address)
+            for node in self._nodes:
+                by_address[node.address()] = node
+            addresses = {x for source in changed + reloaded for x in source.index}
+            for address in addresses:
+                clear_schema_cache(address)
+            result_cache.evict(lambda key: key[0] in addresses)
 
-    def add_node(self, node: Node):
-        self._nodes.add(node)
+            # The previous registry is served until the new one is complete
+            self._sources = sources
+            self._by_address = by_address
+            self._resolved = False
+            self._registry = NodeRegistry(self)
+            return [x.source for x in reloaded]
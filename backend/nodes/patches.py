@@ -1,9 +1,11 @@
-import jsonsubschema
-import jsonschema
+from threading import Lock
 
-__all__ = ["__patch_version__"]
+__all__ = ["__patch_version__", "get_jsonsubschema"]
 __patch_version__ = "0.0.1"
 
+_patch_lock = Lock()
+_patched = False
+
 
 def _post_init(func, execute):
     def wrapper(self, *args, **kwargs):
@@ -14,14 +16,33 @@ def _post_init(func, execute):
     return wrapper
 
 
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
 def _cast_numeric_to_draft4(self):
-    if isinstance(self.exclusiveMaximum, (int, float)):
+    if _is_number(self.exclusiveMaximum):
         self.maximum = self.exclusiveMaximum
         self.exclusiveMaximum = True
-    if isinstance(self.exclusiveMinimum, (int, float)):
+    if _is_number(self.exclusiveMinimum):
         self.minimum = self.exclusiveMinimum
         self.exclusiveMinimum = True
 
 
-jsonsubschema._checkers.JSONTypeNumeric.__init__ = _post_init(jsonsubschema._checkers.JSONTypeNumeric.__init__, _cast_numeric_to_draft4)  # type: ignore
-jsonsubschema.config.set_json_validator_version(jsonschema.Draft202012Validator)  # type: ignore
+def get_jsonsubschema():
+    """Import jsonsubschema, and patch it, on first use.  It and jsonschema are
+    slow to import and are only needed to check schema compatibility.  The
+    patches must only be applied once, concurrent first callers wait."""
+    global _patched
+    import jsonsubschema
+
+    if _patched:
+        return jsonsubschema
+    with _patch_lock:
+        if not _patched:
+            import jsonschema
+
+            jsonsubschema._checkers.JSONTypeNumeric.__init__ = _post_init(jsonsubschema._checkers.JSONTypeNumeric.__init__, _cast_numeric_to_draft4)  # type: ignore
+            jsonsubschema.config.set_json_validator_version(jsonschema.Draft202012Validator)  # type: ignore
+            _patched = True
+    return jsonsubschema
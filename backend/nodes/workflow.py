@@ -2,11 +2,19 @@ import logging
 from traceback import format_exc
 from shortuuid import uuid
 from pydantic import BaseModel, Field
-from typing import Generator, Annotated, Literal
+from typing import AsyncGenerator, Generator, Annotated, Iterable, Literal
 from nodes.base import Node, NodeData, Edge, NodeSchema, EdgeSchema
-from nodes.patches import jsonsubschema
-from nodes.errors import NodeDataSchemaValidationException, NodeDataNotSetException
+from nodes.compatibility import compatibility_cache
+from nodes.errors import (
+    NodeDataSchemaValidationException,
+    NodeDataNotSetException,
+    WorkflowCycleException,
+)
+from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from datetime import datetime
+import asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +64,97 @@ class WorkflowSchema(BaseModel):
     LastRunDetails: RunDetails | None = None
 
 
+@dataclass(frozen=True, eq=False)
+class ExecutionPlan:
+    """A topological ordering of the nodes in a workflow.
+
+    `upstream` and `downstream` map each node to the nodes it receives data
+    from and sends data to.  A plan is immutable and can be reused for as long
+    as the graph it was built from does not change.
+    """
+
+    order: tuple[Node, ...]
+    upstream: dict[Node, frozenset[Node]]
+    downstream: dict[Node, frozenset[Node]]
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @classmethod
+    def build(cls, nodes: set[Node], edges: set[Edge]) -> "ExecutionPlan":
+        """Kahn's algorithm.  Runs in O(N+E) and raises a
+        WorkflowCycleException naming the nodes of a cycle if one exists."""
+        upstream: dict[Node, set[Node]] = {node: set() for node in nodes}
+        downstream: dict[Node, set[Node]] = {node: set() for node in nodes}
+        for edge in edges:
+            upstream[edge.target.node].add(edge.source.node)
+            downstream[edge.source.node].add(edge.target.node)
+
+        in_degree = {node: len(sources) for node, sources in upstream.items()}
+        queue = deque(node for node, degree in in_degree.items() if degree == 0)
+        order: list[Node] = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for child in downstream[node]:
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    queue.append(child)
+
+        if len(order) != len(upstream):
+            cycle = cls._find_cycle(
+                {node for node, degree in in_degree.items() if degree > 0}, upstream
+            )
+            raise WorkflowCycleException(
+                f"Workflow contains a cycle: {' -> '.join(str(x) for x in cycle)}",
+                cycle,
+            )
+
+        return cls(
+            order=tuple(order),
+            upstream={k: frozenset(v) for k, v in upstream.items()},
+            downstream={k: frozenset(v) for k, v in downstream.items()},
+        )
+
+    @classmethod
+    def from_order(
+        cls, order: Iterable[Node], edges: Iterable[Edge]
+    ) -> "ExecutionPlan":
+        """A plan from an order already known to be topological, e.g. one
+        computed by `build` for the same graph."""
+        order = tuple(order)
+        upstream: dict[Node, set[Node]] = {node: set() for node in order}
+        downstream: dict[Node, set[Node]] = {node: set() for node in order}
+        for edge in edges:
+            upstream[edge.target.node].add(edge.source.node)
+            downstream[edge.source.node].add(edge.target.node)
+        return cls(
+            order=order,
+            upstream={k: frozenset(v) for k, v in upstream.items()},
+            downstream={k: frozenset(v) for k, v in downstream.items()},
+        )
+
+    @staticmethod
+    def _find_cycle(
+        remaining: set[Node], upstream: dict[Node, set[Node]]
+    ) -> list[Node]:
+        """Every node left over by Kahn's algorithm has an unprocessed parent, so
+        walking parents from any of them must eventually revisit a node."""
+        node = next(iter(remaining))
+        path: list[Node] = []
+        seen: dict[Node, int] = {}
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = next(x for x in upstream[node] if x in remaining)
+        cycle = path[seen[node] :]
+        cycle.reverse()
+        return cycle + [cycle[0]]
+
+
 class Workflow:
     """
     There can only be once instance of a node within a workflow.
@@ -63,7 +162,7 @@ class Workflow:
     An input may only have one edge.
     All options in a workflow must be set before it can be run.
 
-    We traverse the graph, breadth first, executing nodes and validating the Node data along the edges.
+    We traverse the graph in topological order, executing nodes and validating the Node data along the edges.
     """
 
     def __init__(self, id=None) -> None:
@@ -71,90 +170,204 @@ class Workflow:
         self.nodes: set[Node] = set()
         self.edges: set[Edge] = set()
         self.last_run_details: RunDetails | None = None
+        self._plan: ExecutionPlan | None = None
+        self._nodes_by_id: dict[str, Node] = {}  # Maintained by add_node
+        # Adjacency indexes, maintained by add_edge
+        self._outgoing: dict[NodeData, set[Edge]] = {}
+        self._incoming: dict[NodeData, set[Edge]] = {}
+        self._outgoing_by_node: dict[str, set[Edge]] = {}
+        self._incoming_by_node: dict[str, set[Edge]] = {}
+        # Incremental validation, only dirty elements are rechecked by validate
+        self._dirty_edges: set[Edge] = set()
+        self._dirty_nodes: set[Node] = set()
+        self._incompatible_edges: set[Edge] = set()
+        self._unset_option_nodes: set[Node] = set()
 
     @property
     def roots(self) -> set[Node]:
-        roots = self.nodes.copy()
-        for edge in self.edges:
-            roots.discard(edge.target.node)
-        return roots
+        return {node for node in self.nodes if not self._incoming_by_node.get(node.id)}
+
+    def edges_from(self, source: NodeData | str) -> set[Edge]:
+        """Edges leaving a node output, or leaving any output of the node with the given id."""
+        if isinstance(source, str):
+            return self._outgoing_by_node.get(source, set())
+        return self._outgoing.get(source, set())
+
+    def edges_to(self, target: NodeData | str) -> set[Edge]:
+        """Edges entering a node input, or entering any input of the node with the given id."""
+        if isinstance(target, str):
+            return self._incoming_by_node.get(target, set())
+        return self._incoming.get(target, set())
 
     def reset(self):
         self.seen = set()
 
     def add_node(self, node: Node) -> None:
+        if node in self.nodes:
+            return
         self.nodes.add(node)
+        self._nodes_by_id[node.id] = node
+        node.add_option_listener(self._option_set)
+        self._dirty_nodes.add(node)
+        self._plan = None
+
+    def _option_set(self, data: NodeData) -> None:
+        self._dirty_nodes.add(data.node)
 
     def get_node_by_id(self, id: str) -> Node:
-        for node in self.nodes:
-            if node.id == id:
-                return node
-        raise KeyError(id)
+        return self._nodes_by_id[id]
 
     def add_edge(self, source: NodeData, target: NodeData):
         assert source.type == "output", "Source must be a node output"
         assert target.type == "input", "Target must be a node input"
+        edge = Edge(source, target)
+        assert not (
+            self.edges_to(target) - {edge}
+        ), f"Target {target.node}.{target.key} already has an edge"
         assert self._is_compatible(
             source, target
         ), "Source and target are not compatible"
-        self.edges.add(Edge(source, target))
+        self._index_edge(edge)
+        self._dirty_edges.add(edge)
+        self._plan = None
+
+    def _index_edge(self, edge: Edge) -> None:
+        self.edges.add(edge)
+        self._outgoing.setdefault(edge.source, set()).add(edge)
+        self._incoming.setdefault(edge.target, set()).add(edge)
+        self._outgoing_by_node.setdefault(edge.source.node.id, set()).add(edge)
+        self._incoming_by_node.setdefault(edge.target.node.id, set()).add(edge)
+
+    @classmethod
+    def from_validated(
+        cls, id: str | None, order: list[Node], edges: Iterable[Edge]
+    ) -> "Workflow":
+        """A workflow from a graph that was already checked, e.g. by compiling
+        a plan: `order` holds every node in topological order and every edge is
+        known to be compatible.  Edges are not checked again and the execution
+        plan is not rebuilt, only the nodes' options are checked when run."""
+        workflow = cls(id)
+        for node in order:
+            workflow.add_node(node)
+        for edge in edges:
+            workflow._index_edge(edge)
+        workflow._plan = ExecutionPlan.from_order(order, workflow.edges)
+        return workflow
+
+    def remove_edge(self, edge: Edge) -> None:
+        self.edges.remove(edge)
+        for index, key in [
+            (self._outgoing, edge.source),
+            (self._incoming, edge.target),
+            (self._outgoing_by_node, edge.source.node.id),
+            (self._incoming_by_node, edge.target.node.id),
+        ]:
+            index[key].discard(edge)
+            if not index[key]:
+                del index[key]
+        self._dirty_edges.discard(edge)
+        self._incompatible_edges.discard(edge)
+        self._plan = None
 
     @staticmethod
     def _is_compatible(source: NodeData, target: NodeData) -> bool:
-        return jsonsubschema.isSubschema(
-            source.adapter.json_schema(), target.adapter.json_schema()
+        return compatibility_cache.is_subschema(
+            source.json_schema,
+            target.json_schema,
+            source.schema_hash,
+            target.schema_hash,
         )
 
     def validate(self):
-        for edge in self.edges:
-            if not self._is_compatible(edge.source, edge.target):
-                raise NodeDataSchemaValidationException(
-                    f"Source {edge.source.node} and target {edge.target.node} are not compatible"
-                )
-        for node in self.nodes:
-            if not node.options_set:
-                raise NodeDataNotSetException(f"Node {node} has unset options.")
+        """Check edge compatibility and option completeness.  Results are kept
+        between calls and only edges and nodes that have changed since the last
+        call are checked again."""
+        for edge in self._dirty_edges:
+            if self._is_compatible(edge.source, edge.target):
+                self._incompatible_edges.discard(edge)
+            else:
+                self._incompatible_edges.add(edge)
+        self._dirty_edges.clear()
+        for node in self._dirty_nodes:
+            if node.options_set:
+                self._unset_option_nodes.discard(node)
+            else:
+                self._unset_option_nodes.add(node)
+        self._dirty_nodes.clear()
+
+        for edge in self._incompatible_edges:
+            raise NodeDataSchemaValidationException(
+                f"Source {edge.source.node} and target {edge.target.node} are not compatible"
+            )
+        for node in self._unset_option_nodes:
+            raise NodeDataNotSetException(f"Node {node} has unset options.")
+
+    def plan(self) -> ExecutionPlan:
+        """Return the execution plan for the current graph.  The plan is cached
+        until a node or edge is added."""
+        if self._plan is None:
+            self._plan = ExecutionPlan.build(self.nodes, self.edges)
+        return self._plan
 
     def traverse(self) -> Generator[Node, None, None]:
-        """Breadth first traversal,"""
-        nodes = self.nodes.copy()
-        discard = []
-        while len(nodes) > 0:
-            for node in nodes:
-                if node.ready:
-                    yield node
-                    discard.append(node)
-            if not discard:
-                raise Exception("No nodes are ready to run.")
-            for node in discard:
-                nodes.discard(node)
+        """Topological traversal, every node is yielded after all of its upstream nodes."""
+        yield from self.plan()
 
-    def run(self) -> RunDetails:
+    def run(self, parallel: bool = False, max_workers: int | None = None) -> RunDetails:
+        """Run the workflow.
+
+        :param parallel: Dispatch every node to a thread pool as soon as its inputs are set,
+            so that independent branches run concurrently.
+        :param max_workers: The size of the thread pool used when running in parallel.
+        """
         logger.info(f'Validating workflow: {self.id if self.id else ""}')
         started_on = datetime.now()
         executed = 0
         try:
             self.validate()
-            for node in self.traverse():
-                node.call()
+            execution = (
+                self._execute_parallel(max_workers) if parallel else self._execute()
+            )
+            for _ in execution:
                 executed += 1
-                for edge in self.edges:
-                    if edge.source == node.output:
-                        edge.target.set(node.output.value)
+            return self._finish(started_on, executed)
+        except Exception as e:
+            return self._finish(started_on, executed, e)
+
+    async def arun(self) -> RunDetails:
+        """Run the workflow on the event loop.  Every node is awaited as soon as
+        its inputs are set, nodes with a synchronous run method are offloaded to
+        a thread."""
+        logger.info(f'Validating workflow: {self.id if self.id else ""}')
+        started_on = datetime.now()
+        executed = 0
+        try:
+            self.validate()
+            async for _ in self._aexecute():
+                executed += 1
+            return self._finish(started_on, executed)
+        except Exception as e:
+            return self._finish(started_on, executed, e)
+
+    def _finish(
+        self, started_on: datetime, executed: int, error: Exception | None = None
+    ) -> RunDetails:
+        """Record the details of a run, must be called from the `except` block when a run fails."""
+        if error is None:
             run_details = RunDetails(
                 StartedOn=started_on,
                 FinishedOn=datetime.now(),
                 Status="Success",
                 NodesExecuted=executed,
             )
-        except Exception as e:
+        else:
             run_details = RunDetails(
                 StartedOn=started_on,
                 FinishedOn=datetime.now(),
                 Status="Failed",
                 FailureDetails=ErrorDetails(
-                    Message=str(e),
-                    Class=type(e).__name__,
+                    Message=str(error),
+                    Class=type(error).__name__,
                     Traceback=format_exc(),
                 ),
                 NodesExecuted=executed,
@@ -162,6 +375,83 @@ class Workflow:
         self.last_run_details = run_details
         return run_details
 
+    def _propagate(self, node: Node) -> None:
+        for edge in self.edges_from(node.output):
+            edge.target.set(node.output.value)
+
+    def _execute(self) -> Generator[Node, None, None]:
+        """Call each node in topological order, yielding it once it has run."""
+        for node in self.traverse():
+            node.call()
+            yield node
+            self._propagate(node)
+
+    def _execute_parallel(
+        self, max_workers: int | None = None
+    ) -> Generator[Node, None, None]:
+        """Call nodes on a thread pool, yielding each node once it has run.
+
+        Outputs are propagated on the calling thread, and a node is submitted as
+        soon as all of its upstream nodes have finished.  The first failure is
+        raised and any nodes that have not started yet are cancelled.
+        """
+        plan = self.plan()
+        waiting = {node: len(plan.upstream[node]) for node in plan}
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"workflow-{self.id}"
+        ) as pool:
+            running: dict[Future, Node] = {
+                pool.submit(node.call): node
+                for node, count in waiting.items()
+                if count == 0
+            }
+            try:
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        node = running.pop(future)
+                        future.result()  # Re-raises the node's exception
+                        yield node
+                        self._propagate(node)
+                        for child in plan.downstream[node]:
+                            waiting[child] -= 1
+                            if waiting[child] == 0:
+                                running[pool.submit(child.call)] = child
+            finally:
+                for future in running:
+                    future.cancel()
+
+    async def _aexecute(self) -> AsyncGenerator[Node, None]:
+        """The asyncio counterpart of `_execute_parallel`.  On failure the
+        nodes still running are cancelled and awaited before returning.  Nodes
+        with a synchronous run method cannot be interrupted: their threads run
+        to completion in the background, and their results are discarded."""
+        plan = self.plan()
+        waiting = {node: len(plan.upstream[node]) for node in plan}
+        running: dict[asyncio.Task, Node] = {
+            asyncio.create_task(node.acall()): node
+            for node, count in waiting.items()
+            if count == 0
+        }
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    node = running.pop(task)
+                    task.result()  # Re-raises the node's exception
+                    yield node
+                    self._propagate(node)
+                    for child in plan.downstream[node]:
+                        waiting[child] -= 1
+                        if waiting[child] == 0:
+                            running[asyncio.create_task(child.acall())] = child
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
     def schema(self) -> WorkflowSchema:
         return WorkflowSchema(
             ID=self.id or uuid(),
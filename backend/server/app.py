@@ -1,9 +1,32 @@
-from functools import lru_cache
-from nodes.manager import NodeManager
+import asyncio
+from logging import getLogger
+from fastapi.concurrency import run_in_threadpool
+from nodes import get_node_manager
 from nodes.base import NodeSchema
+from server.plans import plan_cache
 
+logger = getLogger(__name__)
 
-@lru_cache()
-def get_node_manager() -> NodeManager:
-    # todo: load custom sources
-    return NodeManager()
+__all__ = ["get_node_manager", "reload_nodes", "watch_nodes", "NodeSchema"]
+
+
+def reload_nodes() -> list[str]:
+    """Reload changed node sources, dropping the plans compiled from them."""
+    reloaded = get_node_manager().reload()
+    if reloaded:
+        plan_cache.clear()
+    return reloaded
+
+
+async def watch_nodes(interval: float) -> None:
+    """Reload node sources whenever their files change, checking every
+    `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            reloaded = await run_in_threadpool(reload_nodes)
+        except Exception as e:
+            logger.exception(f"Unable to reload node sources: {e}")
+        else:
+            if reloaded:
+                logger.info(f"Reloaded node sources {reloaded}")
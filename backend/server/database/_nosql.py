@@ -1,10 +1,28 @@
+import asyncio
+import base64
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 import json
+import math
+import os
+import random
+import time
 from lib2to3.fixes.fix_idioms import TYPE
 import sys
-from boto3 import resource
-from boto3.dynamodb.conditions import Key, Attr, And, Or, Equals, NotEquals, BeginsWith
+from boto3.session import Session
+from botocore.config import Config
+from boto3.dynamodb.conditions import (
+    Key,
+    Attr,
+    And,
+    Or,
+    Equals,
+    NotEquals,
+    BeginsWith,
+    ConditionExpressionBuilder,
+)
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
 from dataclasses import dataclass
 from pydantic import BaseModel, TypeAdapter, ConfigDict, ValidationError
 from pydantic.fields import FieldInfo, Field, computed_field
@@ -13,9 +31,21 @@ from shortuuid import uuid
 from inspect import isclass
 from server.utils import get_literals_from_regex
 from functools import lru_cache
+from threading import Event, Lock, local
+from queue import Full, Queue
+from weakref import WeakKeyDictionary
+from botocore.exceptions import ClientError
+
+try:
+    import aioboto3
+except ImportError:  # The async API falls back to the sync client in threads
+    aioboto3 = None
+from types import UnionType
 from typing import (
+    AsyncGenerator,
     Generator,
     Generic,
+    Iterable,
     Self,
     Any,
     Type,
@@ -26,12 +56,34 @@ from typing import (
     ClassVar,
     Literal,
     TypedDict,
+    NotRequired,
     List,
     Type,
     overload,
+    get_args,
+    get_origin,
 )
 
-DYNAMODB_DATABASE_URL = "http://localhost:8000"
+DYNAMODB_DATABASE_URL = os.environ.get("DYNAMODB_DATABASE_URL", "http://localhost:8000")
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.environ.get("DYNAMODB_MAX_POOL_CONNECTIONS", 50))
+DYNAMODB_RETRY_MODE = os.environ.get("DYNAMODB_RETRY_MODE", "adaptive")
+DYNAMODB_MAX_ATTEMPTS = int(os.environ.get("DYNAMODB_MAX_ATTEMPTS", 10))
+DYNAMODB_CONNECT_TIMEOUT = float(os.environ.get("DYNAMODB_CONNECT_TIMEOUT", 2))
+DYNAMODB_READ_TIMEOUT = float(os.environ.get("DYNAMODB_READ_TIMEOUT", 10))
+DYNAMODB_TCP_KEEPALIVE = os.environ.get("DYNAMODB_TCP_KEEPALIVE", "1") not in (
+    "0",
+    "false",
+    "False",
+)
+BATCH_WRITE_SIZE = 25  # DynamoDB's limit for BatchWriteItem
+BATCH_GET_SIZE = 100  # DynamoDB's limit for BatchGetItem
+BATCH_MAX_CONCURRENCY = int(os.environ.get("DYNAMODB_BATCH_MAX_CONCURRENCY", 4))
+BATCH_MAX_RETRIES = int(os.environ.get("DYNAMODB_BATCH_MAX_RETRIES", 8))
+BATCH_BACKOFF_BASE = 0.05
+BATCH_BACKOFF_CAP = 5.0
+SCAN_SEGMENTS = int(os.environ.get("DYNAMODB_SCAN_SEGMENTS", 4))
+# Rows read per request by fetch_page, filters may drop most of them
+PAGE_MIN_SIZE = int(os.environ.get("DYNAMODB_PAGE_MIN_SIZE", 100))
 
 # TYPES #
 OperatorClasses = Union[
@@ -58,6 +110,7 @@ class Boto3QueryResponseType(TypedDict):
     ScannedCount: int
     Items: list[dict[str, Any]]
     ResponseMetadata: Boto3ResponseMetadata
+    LastEvaluatedKey: NotRequired[dict[str, Any]]
 
 
 Param = ParamSpec("Param")
@@ -82,23 +135,207 @@ class AttributeDefinitionsElementType(TypedDict):
     AttributeType: KeyAttributeType
 
 
+_clients = local()
+
+
 @lru_cache
+def get_client_config() -> Config:
+    return Config(
+        max_pool_connections=DYNAMODB_MAX_POOL_CONNECTIONS,
+        retries={"mode": DYNAMODB_RETRY_MODE, "max_attempts": DYNAMODB_MAX_ATTEMPTS},
+        connect_timeout=DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=DYNAMODB_READ_TIMEOUT,
+        tcp_keepalive=DYNAMODB_TCP_KEEPALIVE,
+    )
+
+
 def get_service_resource():
-    return resource("dynamodb", endpoint_url=DYNAMODB_DATABASE_URL)
+    """The DynamoDB service resource of the calling thread.  boto3 resources
+    and sessions are not thread safe, so every thread gets its own, each with
+    a connection pool configured by `get_client_config`."""
+    resource = getattr(_clients, "resource", None)
+    if resource is None:
+        resource = Session().resource(
+            "dynamodb", endpoint_url=DYNAMODB_DATABASE_URL, config=get_client_config()
+        )
+        _clients.resource = resource
+    return resource
 
 
-@lru_cache
-def _table_exists(table_name: str) -> bool:
-    resource = get_service_resource()
-    for table in resource.tables.all():
-        if table.name == table_name:
-            return True
-    return False
+def get_client():
+    """The low level DynamoDB client of the calling thread."""
+    return get_service_resource().meta.client
+
+
+def _describe_table(table_name: str) -> dict[str, Any] | None:
+    """The DescribeTable description of a table, or None if it does not exist."""
+    client = get_client()
+    try:
+        return client.describe_table(TableName=table_name)["Table"]
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ResourceNotFoundException":
+            return None
+        raise
+
+
+TableType = TypeVar("TableType", bound="Table")
+_tables: dict[type, "Table"] = {}
+_tables_lock = Lock()
+
+
+def get_table(table_class: Type[TableType]) -> TableType:
+    """The process wide handle of a table.  The table is resolved, and created
+    if needed, the first time it is requested; later calls are a dict lookup."""
+    try:
+        return _tables[table_class]  # type: ignore
+    except KeyError:
+        pass
+    with _tables_lock:
+        if table_class not in _tables:
+            _tables[table_class] = table_class()
+        return _tables[table_class]  # type: ignore
+
+
+def refresh_tables() -> None:
+    """Reload the metadata of every registered table handle."""
+    for table in list(_tables.values()):
+        table.refresh()
+
+
+def clear_tables() -> None:
+    """Forget every registered table handle, they are resolved again on next use."""
+    with _tables_lock:
+        _tables.clear()
+
+
+def _backoff_interval(attempt: int) -> float:
+    """An exponentially growing, jittered, interval between retries of
+    unprocessed batch items."""
+    backoff = min(BATCH_BACKOFF_CAP, BATCH_BACKOFF_BASE * 2**attempt)
+    return random.uniform(0, backoff)
+
+
+def _backoff(attempt: int) -> None:
+    time.sleep(_backoff_interval(attempt))
 
 
-def _cache_clear():
-    _table_exists.cache_clear()
-    get_service_resource.cache_clear()
+_SCAN_DONE = object()  # Marks the end of a scan segment
+
+_async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+    WeakKeyDictionary()
+)
+
+
+async def get_async_client():
+    """The aioboto3 DynamoDB client of the running event loop.  Each loop gets
+    its own client, configured like the sync clients."""
+    assert aioboto3 is not None, "The async client requires aioboto3"
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        context = aioboto3.Session().client(
+            "dynamodb", endpoint_url=DYNAMODB_DATABASE_URL, config=get_client_config()
+        )
+        client = await context.__aenter__()
+        if loop in _async_clients:  # Another task created one while we waited
+            await context.__aexit__(None, None, None)
+            return _async_clients[loop]
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client() -> None:
+    """Close the async client of the running event loop, if it has one."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.__aexit__(None, None, None)
+
+
+async def _aclient_call(operation: str, **params) -> dict[str, Any]:
+    """Call a low level DynamoDB client operation without blocking the event
+    loop.  Without aioboto3 the thread safe sync client is called from a
+    worker thread instead."""
+    if aioboto3 is None:
+        return await asyncio.to_thread(
+            lambda: getattr(get_client(), operation)(**params)
+        )
+    client = await get_async_client()
+    return await getattr(client, operation)(**params)
+
+
+def _to_client_params(table_name: str, params: dict[str, Any]) -> dict[str, Any]:
+    """Convert Table resource parameters, python values and condition objects,
+    to low level client parameters."""
+    serializer = TypeSerializer()
+    builder = ConditionExpressionBuilder()
+    params = dict(params, TableName=table_name)
+    names = dict(params.pop("ExpressionAttributeNames", None) or {})
+    values = {
+        k: serializer.serialize(v)
+        for k, v in (params.pop("ExpressionAttributeValues", None) or {}).items()
+    }
+    for name in ("KeyConditionExpression", "FilterExpression", "ConditionExpression"):
+        condition = params.get(name)
+        if condition is not None and not isinstance(condition, str):
+            built = builder.build_expression(
+                condition, is_key_condition=name == "KeyConditionExpression"
+            )
+            params[name] = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update(
+                {
+                    k: serializer.serialize(v)
+                    for k, v in built.attribute_value_placeholders.items()
+                }
+            )
+    for name in ("Key", "Item", "ExclusiveStartKey"):
+        if params.get(name) is not None:
+            params[name] = {k: serializer.serialize(v) for k, v in params[name].items()}
+    if names:
+        params["ExpressionAttributeNames"] = names
+    if values:
+        params["ExpressionAttributeValues"] = values
+    return params
+
+
+def encode_start_key(key: dict[str, Any] | None) -> str | None:
+    """An opaque continuation token for a `LastEvaluatedKey`."""
+    if not key:
+        return None
+    serializer = TypeSerializer()
+    serialized = {k: serializer.serialize(v) for k, v in key.items()}
+    data = json.dumps(serialized, sort_keys=True, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_start_key(token: str | None) -> dict[str, Any] | None:
+    """The `ExclusiveStartKey` of a continuation token from `encode_start_key`."""
+    if not token:
+        return None
+    deserializer = TypeDeserializer()
+    try:
+        data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        serialized = json.loads(data)
+        assert isinstance(serialized, dict)
+        return {k: deserializer.deserialize(v) for k, v in serialized.items()}
+    except Exception as e:
+        raise ValueError(f"Invalid continuation token: {token}") from e
+
+
+def _from_client_response(response: dict[str, Any]) -> dict[str, Any]:
+    """Convert the attribute values of a low level client response to python
+    values, like the Table resource returns."""
+    deserializer = TypeDeserializer()
+
+    def deserialize(row: dict[str, Any]) -> dict[str, Any]:
+        return {k: deserializer.deserialize(v) for k, v in row.items()}
+
+    if "Items" in response:
+        response["Items"] = [deserialize(row) for row in response["Items"]]
+    for name in ("Item", "Attributes", "LastEvaluatedKey"):
+        if response.get(name) is not None:
+            response[name] = deserialize(response[name])
+    return response
 
 
 @dataclass
@@ -119,6 +356,9 @@ class SortKey(Attribute):
 
 class Item(BaseModel):
     __table__: "Table | None" = None
+    # A sparse secondary index containing only items of this type, scans use it
+    # instead of reading the whole table.  It must project every attribute.
+    __scan_index__: ClassVar[str | None] = None
 
     model_config = ConfigDict(
         populate_by_name=True,
@@ -126,7 +366,11 @@ class Item(BaseModel):
 
     def put(self):
         assert self.__table__ is not None, "You must define a table for this item"
-        self.__table__.put_item(self.model_dump())
+        self.__table__.put_item(to_dynamodb(self))
+
+    async def aput(self):
+        assert self.__table__ is not None, "You must define a table for this item"
+        await self.__table__.aput_item(to_dynamodb(self))
 
     #    @classmethod
     #    def delete(cls, key: str | int, sort_key: str | int | None = None):
@@ -141,16 +385,161 @@ class Item(BaseModel):
     #        response=cls.__table__.table.delete_item(Key=key_dict, ReturnValues="ALL_OLD")
     #        return response
     def delete(self):
+        assert self.__table__ is not None, "You must define a table for this item"
+        response = self.__table__.table.delete_item(
+            Key=self._key(), ReturnValues="ALL_OLD"
+        )
+        return response
+
+    async def adelete(self):
+        assert self.__table__ is not None, "You must define a table for this item"
+        return await self.__table__._arequest(
+            "delete_item", Key=self._key(), ReturnValues="ALL_OLD"
+        )
+
+    @classmethod
+    def batch_delete(
+        cls, items: Iterable[Self], max_concurrency: int = BATCH_MAX_CONCURRENCY
+    ) -> None:
+        """Delete many items of this table, see `Table.batch_delete`."""
+        assert cls.__table__ is not None, "You must define a table for this item"
+        cls.__table__.batch_delete(items, max_concurrency=max_concurrency)
+
+    @classmethod
+    async def abatch_delete(
+        cls, items: Iterable[Self], max_concurrency: int = BATCH_MAX_CONCURRENCY
+    ) -> None:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        await cls.__table__.abatch_delete(items, max_concurrency=max_concurrency)
+
+    def _key(self) -> dict[str, Any]:
         assert self.__table__ is not None, "You must define a table for this item"
         pk = self.__table__._get_partition_key()
         sk = self.__table__._get_sort_key()
         key_dict = {pk.name: getattr(self, pk.name)}
         if sk:
             key_dict[sk.name] = getattr(self, sk.name)
-        response = self.__table__.table.delete_item(
-            Key=key_dict, ReturnValues="ALL_OLD"
+        return key_dict
+
+    @classmethod
+    def _key_dict(cls, key: str | int, sort_key: str | int | None) -> dict[str, Any]:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        pk = cls.__table__._get_partition_key()
+        sk = cls.__table__._get_sort_key()
+        cls._validate_field_value(pk.name, key)
+        key_dict = {pk.name: key}
+        if sk:
+            cls._validate_field_value(sk.name, sort_key)
+            key_dict[sk.name] = sort_key  # type: ignore
+        return key_dict
+
+    @classmethod
+    def increment(
+        cls,
+        attribute: str,
+        key: str | int,
+        sort_key: str | int | None = None,
+        amount: int = 1,
+    ) -> int | None:
+        """Atomically add `amount` to a numeric attribute of an existing item.
+        Returns the new value, or None if the item does not exist."""
+        assert cls.__table__ is not None, "You must define a table for this item"
+        table = cls.__table__.table
+        try:
+            response = table.update_item(
+                **cls._increment_params(attribute, key, sort_key, amount)
+            )
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            return None
+        return int(response["Attributes"][attribute])
+
+    @classmethod
+    async def aincrement(
+        cls,
+        attribute: str,
+        key: str | int,
+        sort_key: str | int | None = None,
+        amount: int = 1,
+    ) -> int | None:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        try:
+            response = await cls.__table__._arequest(
+                "update_item", **cls._increment_params(attribute, key, sort_key, amount)
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            raise
+        return int(response["Attributes"][attribute])
+
+    @classmethod
+    def _increment_params(
+        cls, attribute: str, key: str | int, sort_key: str | int | None, amount: int
+    ) -> dict[str, Any]:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        pk = cls.__table__._get_partition_key()
+        return dict(
+            Key=cls._key_dict(key, sort_key),
+            UpdateExpression="ADD #x0 :amount",
+            ConditionExpression=Attr(pk.name).exists(),
+            ExpressionAttributeNames={"#x0": attribute},
+            ExpressionAttributeValues={":amount": amount},
+            ReturnValues="UPDATED_NEW",
+        )
+
+    @classmethod
+    def update(
+        cls, key: str | int, sort_key: str | int | None = None, **values: Any
+    ) -> Self | None:
+        """Set attributes of an existing item, leaving the others as they are
+        in the table.  Returns the updated item, or None if it does not exist."""
+        assert cls.__table__ is not None, "You must define a table for this item"
+        table = cls.__table__.table
+        try:
+            response = table.update_item(**cls._update_params(key, sort_key, values))
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            return None
+        return cls(**response["Attributes"])
+
+    @classmethod
+    async def aupdate(
+        cls, key: str | int, sort_key: str | int | None = None, **values: Any
+    ) -> Self | None:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        try:
+            response = await cls.__table__._arequest(
+                "update_item", **cls._update_params(key, sort_key, values)
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            raise
+        return cls(**response["Attributes"])
+
+    @classmethod
+    def _update_params(
+        cls, key: str | int, sort_key: str | int | None, values: dict[str, Any]
+    ) -> dict[str, Any]:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        assert values, "Nothing to update"
+        for name, value in values.items():
+            cls._validate_field_value(name, value)
+        data = cls.model_construct(**values).model_dump(
+            mode="json", include=set(values)
+        )
+        names = {f"#x{i}": name for i, name in enumerate(data)}
+        pk = cls.__table__._get_partition_key()
+        return dict(
+            Key=cls._key_dict(key, sort_key),
+            UpdateExpression="SET "
+            + ", ".join(f"{x} = :v{i}" for i, x in enumerate(names)),
+            ConditionExpression=Attr(pk.name).exists(),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues={
+                f":v{i}": _to_decimal(value) for i, value in enumerate(data.values())
+            },
+            ReturnValues="ALL_NEW",
         )
-        return response
 
     @classmethod
     def _validate_field_value(cls, field_name: str, value):
@@ -168,24 +557,44 @@ class Item(BaseModel):
     @classmethod
     def get(cls, key: str | int, sort_key: str | int | None = None) -> Self | None:
         assert cls.__table__ is not None, "You must define a table for this item"
+        response: Boto3QueryResponseType = cls.__table__.table.query(
+            **cls._get_params(key, sort_key)
+        )
+        return cls._get_result(response, key, sort_key)
+
+    @classmethod
+    async def aget(
+        cls, key: str | int, sort_key: str | int | None = None
+    ) -> Self | None:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        response: Boto3QueryResponseType = await cls.__table__._arequest(
+            "query", **cls._get_params(key, sort_key)
+        )
+        return cls._get_result(response, key, sort_key)
+
+    @classmethod
+    def _get_params(cls, key: str | int, sort_key: str | int | None) -> dict[str, Any]:
         (
             projection_expression,
             projection_attribute_names,
         ) = cls._get_projection_expression()
-        pk = cls.__table__._get_partition_key()
-        sk = cls.__table__._get_sort_key()
-        cls._validate_field_value(pk.name, key)
-        exp = Key(pk.name).eq(key)
-        if sk:
-            cls._validate_field_value(sk.name, sort_key)
-            exp = exp & Key(sk.name).eq(sort_key)
-
-        response: Boto3QueryResponseType = cls.__table__.table.query(
+        exp = None
+        for name, value in cls._key_dict(key, sort_key).items():
+            exp = Key(name).eq(value) if exp is None else exp & Key(name).eq(value)
+        return dict(
             KeyConditionExpression=exp,
             Select="SPECIFIC_ATTRIBUTES",
             ProjectionExpression=projection_expression,
             ExpressionAttributeNames=projection_attribute_names,
         )
+
+    @classmethod
+    def _get_result(
+        cls,
+        response: Boto3QueryResponseType,
+        key: str | int,
+        sort_key: str | int | None,
+    ) -> Self | None:
         assert (
             response["Count"] <= 1
         ), f"Multiplicity Error: The keys: PK:{key}, SK:{sort_key} are not unique"
@@ -195,6 +604,58 @@ class Item(BaseModel):
         else:
             return cls(**response["Items"][0])
 
+    @classmethod
+    def batch_get(
+        cls, keys: Iterable[tuple[str | int, str | int | None]]
+    ) -> list[Self | None]:
+        """Get many items by (key, sort_key) with BatchGetItem.  Results are
+        returned in the order of `keys`, with None for keys that do not exist."""
+        assert cls.__table__ is not None, "You must define a table for this item"
+        key_dicts = [cls._key_dict(key, sort_key) for key, sort_key in keys]
+        (
+            projection_expression,
+            projection_attribute_names,
+        ) = cls._get_projection_expression()
+        rows = cls.__table__.batch_get(
+            key_dicts,
+            projection_expression=projection_expression,
+            expression_attribute_names=projection_attribute_names,
+        )
+        return cls._batch_get_results(key_dicts, rows)
+
+    @classmethod
+    async def abatch_get(
+        cls, keys: Iterable[tuple[str | int, str | int | None]]
+    ) -> list[Self | None]:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        key_dicts = [cls._key_dict(key, sort_key) for key, sort_key in keys]
+        (
+            projection_expression,
+            projection_attribute_names,
+        ) = cls._get_projection_expression()
+        rows = await cls.__table__.abatch_get(
+            key_dicts,
+            projection_expression=projection_expression,
+            expression_attribute_names=projection_attribute_names,
+        )
+        return cls._batch_get_results(key_dicts, rows)
+
+    @classmethod
+    def _batch_get_results(
+        cls, key_dicts: list[dict[str, Any]], rows: list[dict[str, Any]]
+    ) -> list[Self | None]:
+        """Match the rows of a BatchGetItem response to the requested keys."""
+
+        def identity(row: dict[str, Any]) -> tuple:
+            return tuple(row.get(name) for name in key_dicts[0])
+
+        found = {identity(row): row for row in rows}
+        results: list[Self | None] = []
+        for key_dict in key_dicts:
+            row = found.get(identity(key_dict))
+            results.append(None if row is None else cls(**row))
+        return results
+
     @classmethod
     def _filter(
         cls, items: list[dict], raise_validation_error: bool = False
@@ -215,32 +676,75 @@ class Item(BaseModel):
         key_expression: Key | Operators | None = None,
         key_operator: OperatorClasses = And,
         filter: bool = True,
+        limit: int | None = None,
+        start_key: dict[str, Any] | None = None,
+    ) -> "QueryResponse[Self]":
+        """Query the items of a partition, up to `limit` rows are read starting
+        after `start_key`, see `Table.fetch_page`."""
+        assert cls.__table__ is not None, "You must define a table for this item"
+        response = cls.__table__.fetch_page(
+            "query",
+            limit,
+            **cls._query_params(key, key_expression, key_operator, start_key),
+        )
+        return cls._query_response(response, filter)
+
+    @classmethod
+    async def aquery(
+        cls,
+        key: str | int,
+        key_expression: Key | Operators | None = None,
+        key_operator: OperatorClasses = And,
+        filter: bool = True,
+        limit: int | None = None,
+        start_key: dict[str, Any] | None = None,
     ) -> "QueryResponse[Self]":
+        assert cls.__table__ is not None, "You must define a table for this item"
+        response = await cls.__table__.afetch_page(
+            "query",
+            limit,
+            **cls._query_params(key, key_expression, key_operator, start_key),
+        )
+        return cls._query_response(response, filter)
+
+    @classmethod
+    def _query_params(
+        cls,
+        key: str | int,
+        key_expression: Key | Operators | None,
+        key_operator: OperatorClasses,
+        start_key: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
         assert cls.__table__ is not None, "You must define a table for this item"
         (
             projection_expression,
             projection_attribute_names,
         ) = cls._get_projection_expression()
         pk = cls.__table__._get_partition_key()
-        sk = cls.__table__._get_sort_key()
         cls._validate_field_value(pk.name, key)
         exp = Key(pk.name).eq(key)
 
         if key_expression:
             exp = key_operator(exp, key_expression)
 
-        response: Boto3QueryResponseType = cls.__table__.query(  # type: ignore
-            key_condition_expression=exp,
-            select="SPECIFIC_ATTRIBUTES",
-            projection_expression=projection_expression,
-            expression_attribute_names=projection_attribute_names,
-            raw=True,
+        return dict(
+            KeyConditionExpression=exp,
+            Select="SPECIFIC_ATTRIBUTES",
+            ProjectionExpression=projection_expression,
+            ExpressionAttributeNames=projection_attribute_names,
+            ExclusiveStartKey=start_key,
         )
+
+    @classmethod
+    def _query_response(
+        cls, response: Boto3QueryResponseType, filter: bool
+    ) -> "QueryResponse[Self]":
         return QueryResponse(
             Count=response.get("Count"),
             ScannedCount=response.get("ScannedCount"),
             Items=cls._filter(response["Items"], raise_validation_error=not filter),
             ResponseMetadata=response.get("ResponseMetadata"),
+            LastEvaluatedKey=response.get("LastEvaluatedKey"),
         )
 
     @classmethod
@@ -248,9 +752,70 @@ class Item(BaseModel):
         cls,
         limit: int | None = None,
         index_name: str | None = None,
-        start_key: str | None = None,
+        start_key: dict[str, Any] | None = None,
+        filter: bool = True,
+    ) -> "QueryResponse[Self]":
+        """Scan for items of this type, up to `limit` rows are read starting
+        after `start_key`, see `Table.fetch_page`."""
+        assert cls.__table__ is not None, "You must define a table for this item"
+        items = cls.__table__.fetch_page(
+            "scan", limit, **cls._scan_params(None, index_name, start_key)
+        )
+        items["Items"] = cls._filter(items["Items"], not filter)
+        return QueryResponse(**items)
+
+    @classmethod
+    async def ascan(
+        cls,
+        limit: int | None = None,
+        index_name: str | None = None,
+        start_key: dict[str, Any] | None = None,
         filter: bool = True,
     ) -> "QueryResponse[Self]":
+        assert cls.__table__ is not None, "You must define a table for this item"
+        items = await cls.__table__.afetch_page(
+            "scan", limit, **cls._scan_params(None, index_name, start_key)
+        )
+        items["Items"] = cls._filter(items["Items"], not filter)
+        return QueryResponse(**items)
+
+    @classmethod
+    def iter_scan(
+        cls,
+        total_segments: int = SCAN_SEGMENTS,
+        page_size: int | None = None,
+        index_name: str | None = None,
+        filter: bool = True,
+    ) -> Generator[Self, None, None]:
+        """Stream every item of this type, see `Table.scan_pages`."""
+        assert cls.__table__ is not None, "You must define a table for this item"
+        for page in cls.__table__.scan_pages(
+            total_segments, **cls._scan_params(page_size, index_name, None)
+        ):
+            yield from cls._filter(page["Items"], not filter)
+
+    @classmethod
+    async def aiter_scan(
+        cls,
+        total_segments: int = SCAN_SEGMENTS,
+        page_size: int | None = None,
+        index_name: str | None = None,
+        filter: bool = True,
+    ) -> AsyncGenerator[Self, None]:
+        assert cls.__table__ is not None, "You must define a table for this item"
+        async for page in cls.__table__.ascan_pages(
+            total_segments, **cls._scan_params(page_size, index_name, None)
+        ):
+            for item in cls._filter(page["Items"], not filter):
+                yield item
+
+    @classmethod
+    def _scan_params(
+        cls,
+        limit: int | None,
+        index_name: str | None,
+        start_key: dict[str, Any] | None,
+    ) -> dict[str, Any]:
         assert cls.__table__ is not None, "You must define a table for this item"
         (
             projection_expression,
@@ -268,21 +833,19 @@ class Item(BaseModel):
         # fmt: off
         params: dict[str, Any] = {k: v for k, v in {
             "Limit": limit,
-            "IndexName": index_name,
+            "IndexName": index_name or cls.__scan_index__,
             "FilterExpression": expression,
             "ExclusiveStartKey" : start_key
             }.items() if v is not None
         }
         # fmt: on
 
-        items = cls.__table__.table.scan(
+        return dict(
             Select="SPECIFIC_ATTRIBUTES",
             ProjectionExpression=projection_expression,
             ExpressionAttributeNames=projection_attribute_names,
             **params,
         )
-        items["Items"] = cls._filter(items["Items"], not filter)
-        return QueryResponse(**items)
 
     @staticmethod
     def _get_expression(conditions: list[Key | Operators]) -> None | Key | Operators:
@@ -312,29 +875,80 @@ class QueryResponse(Generic[T]):
         ScannedCount: int,
         Count: int,
         ResponseMetadata: Boto3ResponseMetadata,
+        LastEvaluatedKey: dict[str, Any] | None = None,
     ) -> None:
         self.items: List[T] = Items
         self.scanned_count: int = ScannedCount
         self.count: int = Count
         self.response_metadata: Boto3ResponseMetadata = ResponseMetadata
+        self.last_evaluated_key: dict[str, Any] | None = LastEvaluatedKey
+
+
+_SCALAR_TYPES = (str, int, bool, type(None))
+_decimal_fields: dict[type[BaseModel], tuple[str, ...]] = {}
+
+
+def _may_hold_floats(annotation: Any) -> bool:
+    if annotation in _SCALAR_TYPES:
+        return False
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return False
+    if origin is Annotated:
+        return _may_hold_floats(get_args(annotation)[0])
+    if origin in (Union, UnionType):
+        return any(_may_hold_floats(x) for x in get_args(annotation))
+    return True
+
+
+def _get_decimal_fields(model: type[BaseModel]) -> tuple[str, ...]:
+    """The fields of a model that may hold floats, and so must be converted to
+    Decimal.  Computed once per model class."""
+    try:
+        return _decimal_fields[model]
+    except KeyError:
+        pass
+    fields = [
+        name
+        for name, field in model.model_fields.items()
+        if _may_hold_floats(field.annotation)
+    ]
+    fields.extend(
+        name
+        for name, field in model.model_computed_fields.items()
+        if _may_hold_floats(field.return_type)
+    )
+    _decimal_fields[model] = tuple(fields)
+    return _decimal_fields[model]
+
+
+def _to_decimal(value: Any) -> Any:
+    if isinstance(value, float):
+        # DynamoDB has no NaN or Infinity, json serialization writes them as null
+        return Decimal(repr(value)) if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _to_decimal(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_decimal(x) for x in value]
+    return value
+
+
+def to_dynamodb(model: BaseModel) -> dict[str, Any]:
+    """The attributes of a model as values boto3 can serialize: json compatible
+    values, with every float converted to Decimal.  Fields that cannot hold a
+    float are not walked."""
+    data = model.model_dump(mode="json")
+    for name in _get_decimal_fields(type(model)):
+        if name in data:
+            data[name] = _to_decimal(data[name])
+    return data
 
 
 def _convert_base_model(func):
     def wrapper(*args, **kwargs):
-        new_args = [
-            (
-                json.loads(x.model_dump_json(), parse_float=Decimal)
-                if isinstance(x, BaseModel)
-                else x
-            )
-            for x in args
-        ]
+        new_args = [to_dynamodb(x) if isinstance(x, BaseModel) else x for x in args]
         new_kwargs = {
-            k: (
-                json.loads(v.model_dump_json(), parse_float=Decimal)
-                if isinstance(v, BaseModel)
-                else v
-            )
+            k: to_dynamodb(v) if isinstance(v, BaseModel) else v
             for k, v in kwargs.items()
         }
         return func(*new_args, **new_kwargs)
@@ -350,20 +964,38 @@ class Table:
     _ItemType = TypeVar("_ItemType", __item_schema__, BaseModel)
 
     def __init__(self) -> None:
-        self.resource = get_service_resource()
+        self._local = local()
         self._deleted = False
-        if not _table_exists(self.__tablename__) and not (
-            _cache_clear() or _table_exists(self.__tablename__)
-        ):
-            try:
-                logger.info(f"Creating new table: {self.__tablename__}")
-                self._table = self.create_table()
-            finally:
-                _cache_clear()
+        self.description = _describe_table(self.__tablename__)
+        if self.description is None:
+            logger.info(f"Creating new table: {self.__tablename__}")
+            self._table = self.create_table()
+            self._table.wait_until_exists()
+            self.description = _describe_table(self.__tablename__)
         else:
             self._table = self.resource.Table(self.__tablename__)
         self._apply_table_to_items()
 
+    @property
+    def resource(self):
+        return get_service_resource()
+
+    @property
+    def _table(self):
+        # Table resources are bound to the calling thread's service resource.
+        table = getattr(self._local, "table", None)
+        if table is None:
+            table = self._local.table = self.resource.Table(self.__tablename__)
+        return table
+
+    @_table.setter
+    def _table(self, table) -> None:
+        self._local.table = table
+
+    def refresh(self) -> None:
+        """Reload the table's metadata with DescribeTable."""
+        self.description = _describe_table(self.__tablename__)
+
     @contextmanager
     def batch_writer(self):
         with self._table.batch_writer() as batch:
@@ -371,13 +1003,243 @@ class Table:
             batch.delete_item = _convert_base_model(batch.delete_item)
             yield batch
 
+    def batch_delete(
+        self,
+        keys: Iterable["dict[str, Any] | Item"],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    ) -> None:
+        """Delete items, or items by key, using key-only BatchWriteItem requests.
+
+        Keys are sent in chunks of 25, up to `max_concurrency` chunks at a time.
+        Unprocessed items are retried with exponential backoff.
+        """
+        self._write(self._delete_requests(keys), max_concurrency)
+
+    async def abatch_delete(
+        self,
+        keys: Iterable["dict[str, Any] | Item"],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    ) -> None:
+        await self._awrite(self._delete_requests(keys), max_concurrency)
+
+    def batch_put(
+        self,
+        items: Iterable["dict[str, Any] | Item"],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    ) -> None:
+        """Put items using BatchWriteItem requests, see `batch_delete`."""
+        self._write(self._put_requests(items), max_concurrency)
+
+    async def abatch_put(
+        self,
+        items: Iterable["dict[str, Any] | Item"],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    ) -> None:
+        await self._awrite(self._put_requests(items), max_concurrency)
+
+    @staticmethod
+    def _delete_requests(
+        keys: Iterable["dict[str, Any] | Item"],
+    ) -> list[dict[str, Any]]:
+        serializer = TypeSerializer()
+        keys = [x._key() if isinstance(x, Item) else x for x in keys]
+        return [
+            {
+                "DeleteRequest": {
+                    "Key": {k: serializer.serialize(v) for k, v in key.items()}
+                }
+            }
+            for key in keys
+        ]
+
+    @staticmethod
+    def _put_requests(
+        items: Iterable["dict[str, Any] | Item"],
+    ) -> list[dict[str, Any]]:
+        serializer = TypeSerializer()
+        items = [to_dynamodb(x) if isinstance(x, BaseModel) else x for x in items]
+        return [
+            {
+                "PutRequest": {
+                    "Item": {k: serializer.serialize(v) for k, v in item.items()}
+                }
+            }
+            for item in items
+        ]
+
+    def _write(self, requests: list[dict[str, Any]], max_concurrency: int) -> None:
+        chunks = [
+            requests[i : i + BATCH_WRITE_SIZE]
+            for i in range(0, len(requests), BATCH_WRITE_SIZE)
+        ]
+        # The low level client is thread safe, the resource is not.  Sharing
+        # the calling thread's client avoids creating one per worker thread.
+        client = self.resource.meta.client
+        if len(chunks) <= 1 or max_concurrency <= 1:
+            for chunk in chunks:
+                self._batch_write(chunk, client)
+            return
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(chunks))) as pool:
+            for _ in pool.map(lambda chunk: self._batch_write(chunk, client), chunks):
+                pass  # Re-raises the first failure
+
+    async def _awrite(
+        self, requests: list[dict[str, Any]], max_concurrency: int
+    ) -> None:
+        chunks = [
+            requests[i : i + BATCH_WRITE_SIZE]
+            for i in range(0, len(requests), BATCH_WRITE_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def write(chunk: list[dict[str, Any]]) -> None:
+            async with semaphore:
+                await self._abatch_write(chunk)
+
+        await asyncio.gather(*(write(chunk) for chunk in chunks))
+
+    def batch_get(
+        self,
+        keys: Iterable[dict[str, Any]],
+        projection_expression: str | None = None,
+        expression_attribute_names: dict[str, str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get the raw rows for many keys using BatchGetItem, 100 keys per request.
+        Unprocessed keys are retried with exponential backoff.  Rows are returned
+        in no particular order and missing keys are omitted."""
+        client = self.resource.meta.client
+        rows: list[dict[str, Any]] = []
+        for request_items in self._batch_get_requests(
+            keys, projection_expression, expression_attribute_names
+        ):
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                response = client.batch_get_item(RequestItems=request_items)
+                rows.extend(self._batch_get_rows(response))
+                request_items = response.get("UnprocessedKeys") or {}
+                if not request_items:
+                    break
+                _backoff(attempt)
+            else:
+                raise RuntimeError(
+                    f"BatchGetItem on {self.__tablename__}: unprocessed keys after {BATCH_MAX_RETRIES} retries"
+                )
+        return rows
+
+    async def abatch_get(
+        self,
+        keys: Iterable[dict[str, Any]],
+        projection_expression: str | None = None,
+        expression_attribute_names: dict[str, str] | None = None,
+    ) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        for request_items in self._batch_get_requests(
+            keys, projection_expression, expression_attribute_names
+        ):
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                response = await _aclient_call(
+                    "batch_get_item", RequestItems=request_items
+                )
+                rows.extend(self._batch_get_rows(response))
+                request_items = response.get("UnprocessedKeys") or {}
+                if not request_items:
+                    break
+                await asyncio.sleep(_backoff_interval(attempt))
+            else:
+                raise RuntimeError(
+                    f"BatchGetItem on {self.__tablename__}: unprocessed keys after {BATCH_MAX_RETRIES} retries"
+                )
+        return rows
+
+    def _batch_get_requests(
+        self,
+        keys: Iterable[dict[str, Any]],
+        projection_expression: str | None,
+        expression_attribute_names: dict[str, str] | None,
+    ) -> list[dict[str, Any]]:
+        """The RequestItems of each BatchGetItem request for `keys`."""
+        serializer = TypeSerializer()
+        unique: dict[str, dict[str, Any]] = {}
+        for key in keys:
+            serialized = {k: serializer.serialize(v) for k, v in key.items()}
+            unique.setdefault(json.dumps(serialized, sort_keys=True), serialized)
+        requests = list(unique.values())
+        params: dict[str, Any] = {
+            k: v
+            for k, v in {
+                "ProjectionExpression": projection_expression,
+                "ExpressionAttributeNames": expression_attribute_names,
+            }.items()
+            if v is not None
+        }
+        return [
+            {self.__tablename__: {"Keys": requests[i : i + BATCH_GET_SIZE], **params}}
+            for i in range(0, len(requests), BATCH_GET_SIZE)
+        ]
+
+    def _batch_get_rows(self, response: dict[str, Any]) -> list[dict[str, Any]]:
+        deserializer = TypeDeserializer()
+        return [
+            {k: deserializer.deserialize(v) for k, v in row.items()}
+            for row in response.get("Responses", {}).get(self.__tablename__, [])
+        ]
+
+    def _batch_write(self, requests: list[dict[str, Any]], client) -> None:
+        request_items: dict[str, list] = {self.__tablename__: requests}
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            response = client.batch_write_item(RequestItems=request_items)
+            request_items = response.get("UnprocessedItems") or {}
+            if not request_items:
+                return
+            _backoff(attempt)
+        unprocessed = len(request_items.get(self.__tablename__, []))
+        raise RuntimeError(
+            f"BatchWriteItem on {self.__tablename__}: {unprocessed} unprocessed items after {BATCH_MAX_RETRIES} retries"
+        )
+
+    async def _abatch_write(self, requests: list[dict[str, Any]]) -> None:
+        request_items: dict[str, list] = {self.__tablename__: requests}
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            response = await _aclient_call(
+                "batch_write_item", RequestItems=request_items
+            )
+            request_items = response.get("UnprocessedItems") or {}
+            if not request_items:
+                return
+            await asyncio.sleep(_backoff_interval(attempt))
+        unprocessed = len(request_items.get(self.__tablename__, []))
+        raise RuntimeError(
+            f"BatchWriteItem on {self.__tablename__}: {unprocessed} unprocessed items after {BATCH_MAX_RETRIES} retries"
+        )
+
     @classmethod
     def items(cls) -> Generator[tuple[str, Type[Item]], None, None]:
+        yield from cls._item_types()[0]
+
+    @classmethod
+    def _item_types(
+        cls,
+    ) -> tuple[tuple[tuple[str, Type[Item]], ...], dict[str, Type[Item]]]:
+        """The item types of this table, and a map of each item type's
+        `Resource` literal to the type.  Computed once and cached in the
+        class's own __dict__."""
+        try:
+            return cls.__dict__["_item_types_cache"]
+        except KeyError:
+            pass
+        items = []
+        resources: dict[str, Type[Item]] = {}
         for attr in dir(cls):
             if not attr.startswith("_"):
                 obj = getattr(cls, attr)
                 if isclass(obj) and issubclass(obj, Item):
-                    yield attr, obj
+                    items.append((attr, obj))
+                    field = obj.model_fields.get("Resource")
+                    if field is not None and get_origin(field.annotation) is Literal:
+                        for value in get_args(field.annotation):
+                            resources[value] = obj
+        cache = (tuple(items), resources)
+        setattr(cls, "_item_types_cache", cache)
+        return cache
 
     def create_table(self):
         return self.resource.create_table(
@@ -394,7 +1256,34 @@ class Table:
         index_name: str | None = None,
         raw: bool = False,
     ) -> Boto3QueryResponseType | QueryResponse[Item]:
-        params = {
+        response: Boto3QueryResponseType = self.table.scan(
+            **self._scan_params(select, limit, index_name)
+        )
+        if raw:
+            return response
+        else:
+            return self._get_query_response_from_boto3_response(response)
+
+    async def ascan(
+        self,
+        select: SelectType = "ALL_ATTRIBUTES",
+        limit: int | None = None,
+        index_name: str | None = None,
+        raw: bool = False,
+    ) -> Boto3QueryResponseType | QueryResponse[Item]:
+        response: Boto3QueryResponseType = await self._arequest(
+            "scan", **self._scan_params(select, limit, index_name)
+        )
+        if raw:
+            return response
+        else:
+            return self._get_query_response_from_boto3_response(response)
+
+    @staticmethod
+    def _scan_params(
+        select: SelectType, limit: int | None, index_name: str | None
+    ) -> dict[str, Any]:
+        return {
             k: v
             for k, v in {
                 "Select": select,
@@ -403,13 +1292,37 @@ class Table:
             }.items()
             if v
         }
-        response: Boto3QueryResponseType = self.table.scan(**params)
+
+    def query(
+        self,
+        key_condition_expression: Key | Operators | None,
+        select: Selections = "ALL_ATTRIBUTES",
+        projection_expression: str | None = None,
+        expression_attribute_names: dict[str, str] | None = None,
+        scan_index_forward: bool = True,
+        limit: int | None = None,
+        index_name: str | None = None,
+        exclusive_start_key: dict[str, Any] | None = None,
+        raw: bool = False,
+    ) -> QueryResponse[Item]:
+        response: Boto3QueryResponseType = self.table.query(
+            **self._query_params(
+                key_condition_expression,
+                select,
+                projection_expression,
+                expression_attribute_names,
+                scan_index_forward,
+                limit,
+                index_name,
+                exclusive_start_key,
+            )
+        )
         if raw:
-            return response
+            return response  # type: ignore
         else:
             return self._get_query_response_from_boto3_response(response)
 
-    def query(
+    async def aquery(
         self,
         key_condition_expression: Key | Operators | None,
         select: Selections = "ALL_ATTRIBUTES",
@@ -421,7 +1334,35 @@ class Table:
         exclusive_start_key: dict[str, Any] | None = None,
         raw: bool = False,
     ) -> QueryResponse[Item]:
+        response: Boto3QueryResponseType = await self._arequest(
+            "query",
+            **self._query_params(
+                key_condition_expression,
+                select,
+                projection_expression,
+                expression_attribute_names,
+                scan_index_forward,
+                limit,
+                index_name,
+                exclusive_start_key,
+            ),
+        )
+        if raw:
+            return response  # type: ignore
+        else:
+            return self._get_query_response_from_boto3_response(response)
 
+    @staticmethod
+    def _query_params(
+        key_condition_expression: Key | Operators | None,
+        select: Selections,
+        projection_expression: str | None,
+        expression_attribute_names: dict[str, str] | None,
+        scan_index_forward: bool,
+        limit: int | None,
+        index_name: str | None,
+        exclusive_start_key: dict[str, Any] | None,
+    ) -> dict[str, Any]:
         params = dict(
             ProjectionExpression=projection_expression,
             ExpressionAttributeNames=expression_attribute_names,
@@ -431,30 +1372,393 @@ class Table:
             ExclusiveStartKey=exclusive_start_key,
         )
         params = {k: v for k, v in params.items() if v is not None}
-        response: Boto3QueryResponseType = self.table.query(
+        return dict(
             KeyConditionExpression=key_condition_expression,
             Select=select,
             **params,
         )
-        if raw:
-            return response  # type: ignore
-        else:
-            return self._get_query_response_from_boto3_response(response)
+
+    def query_pages(
+        self,
+        key_condition_expression: Key | Operators | None,
+        select: Selections = "ALL_ATTRIBUTES",
+        projection_expression: str | None = None,
+        expression_attribute_names: dict[str, str] | None = None,
+        scan_index_forward: bool = True,
+        page_size: int | None = None,
+        index_name: str | None = None,
+        exclusive_start_key: dict[str, Any] | None = None,
+        max_pages: int | None = None,
+    ) -> Generator[QueryResponse[Item], None, None]:
+        """Query every page of results, following `LastEvaluatedKey`.
+
+        Pages are requested lazily, one at a time, so at most one page is held
+        in memory by the generator.  `page_size` bounds the number of items
+        evaluated per request and `max_pages` the number of requests made.
+        """
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            page = self.query(
+                key_condition_expression,
+                select=select,
+                projection_expression=projection_expression,
+                expression_attribute_names=expression_attribute_names,
+                scan_index_forward=scan_index_forward,
+                limit=page_size,
+                index_name=index_name,
+                exclusive_start_key=exclusive_start_key,
+            )
+            pages += 1
+            yield page
+            exclusive_start_key = page.last_evaluated_key
+            if not exclusive_start_key:
+                break
+
+    def fetch_page(
+        self, operation: Literal["query", "scan"], limit: int | None = None, **params
+    ) -> Boto3QueryResponseType:
+        """Make Query or Scan requests, following `LastEvaluatedKey`, until
+        `limit` rows have been read or there are no more.  `params` are the
+        request parameters, as for `table.query` and `table.scan`.
+
+        Each request reads at least `PAGE_MIN_SIZE` rows, since a filter may
+        drop most of them.  The response holds at most `limit` items, when more
+        were read its `LastEvaluatedKey` is the key of the last item kept, so
+        the next page starts right after it.  Without a limit every row is read.
+        """
+        request = getattr(self.table, operation)
+        params = {k: v for k, v in params.items() if v is not None}
+        items: list[dict[str, Any]] = []
+        scanned = 0
+        while True:
+            if limit is not None:
+                params["Limit"] = max(limit, PAGE_MIN_SIZE)
+            response = request(**params)
+            items.extend(response["Items"])
+            scanned += response.get("ScannedCount", 0)
+            if not self._page_continues(response, items, limit):
+                return self._page_response(response, items, scanned, limit, params)
+            params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    async def afetch_page(
+        self, operation: Literal["query", "scan"], limit: int | None = None, **params
+    ) -> Boto3QueryResponseType:
+        params = {k: v for k, v in params.items() if v is not None}
+        items: list[dict[str, Any]] = []
+        scanned = 0
+        while True:
+            if limit is not None:
+                params["Limit"] = max(limit, PAGE_MIN_SIZE)
+            response = await self._arequest(operation, **params)
+            items.extend(response["Items"])
+            scanned += response.get("ScannedCount", 0)
+            if not self._page_continues(response, items, limit):
+                return self._page_response(response, items, scanned, limit, params)
+            params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    @staticmethod
+    def _page_continues(
+        response: dict[str, Any], items: list[dict[str, Any]], limit: int | None
+    ) -> bool:
+        if not response.get("LastEvaluatedKey"):
+            return False
+        return limit is None or len(items) < limit
+
+    def _page_response(
+        self,
+        response: dict[str, Any],
+        items: list[dict[str, Any]],
+        scanned: int,
+        limit: int | None,
+        params: dict[str, Any],
+    ) -> Boto3QueryResponseType:
+        last_key = response.get("LastEvaluatedKey")
+        if limit is not None and len(items) > limit:
+            items = items[:limit]
+            key_names = last_key or self._page_key_names(params.get("IndexName"))
+            last_key = {name: items[-1][name] for name in key_names}
+        page: Boto3QueryResponseType = {
+            "Items": items,
+            "Count": len(items),
+            "ScannedCount": scanned,
+            "ResponseMetadata": response.get("ResponseMetadata"),  # type: ignore
+        }
+        if last_key:
+            page["LastEvaluatedKey"] = last_key
+        return page
+
+    def _page_key_names(self, index_name: str | None) -> list[str]:
+        """The attributes of a `LastEvaluatedKey`: the table's keys, and the
+        index's keys when reading an index."""
+        names = [self._get_partition_key().name]
+        sort_key = self._get_sort_key()
+        if sort_key is not None:
+            names.append(sort_key.name)
+        if index_name is not None:
+            indexes = (self.table.global_secondary_indexes or []) + (
+                self.table.local_secondary_indexes or []
+            )
+            for index in indexes:
+                if index["IndexName"] == index_name:
+                    names.extend(x["AttributeName"] for x in index["KeySchema"])
+        return list(dict.fromkeys(names))
+
+    def query_page(
+        self,
+        key_condition_expression: Key | Operators | None,
+        limit: int | None = None,
+        exclusive_start_key: dict[str, Any] | None = None,
+        select: Selections = "ALL_ATTRIBUTES",
+        scan_index_forward: bool = True,
+        index_name: str | None = None,
+    ) -> QueryResponse[Item]:
+        """Query items of any type, see `fetch_page`."""
+        response = self.fetch_page(
+            "query",
+            limit,
+            **self._query_params(
+                key_condition_expression,
+                select,
+                None,
+                None,
+                scan_index_forward,
+                None,
+                index_name,
+                exclusive_start_key,
+            ),
+        )
+        return self._get_query_response_from_boto3_response(response)
+
+    async def aquery_page(
+        self,
+        key_condition_expression: Key | Operators | None,
+        limit: int | None = None,
+        exclusive_start_key: dict[str, Any] | None = None,
+        select: Selections = "ALL_ATTRIBUTES",
+        scan_index_forward: bool = True,
+        index_name: str | None = None,
+    ) -> QueryResponse[Item]:
+        response = await self.afetch_page(
+            "query",
+            limit,
+            **self._query_params(
+                key_condition_expression,
+                select,
+                None,
+                None,
+                scan_index_forward,
+                None,
+                index_name,
+                exclusive_start_key,
+            ),
+        )
+        return self._get_query_response_from_boto3_response(response)
+
+    def scan_pages(
+        self, total_segments: int = 1, **params
+    ) -> Generator[dict[str, Any], None, None]:
+        """Scan every page of the table, or of `IndexName`, following
+        `LastEvaluatedKey`.  `params` are Scan parameters, as for `table.scan`.
+
+        With more than one segment, the segments are scanned in parallel by a
+        pool of worker threads and pages are yielded as they arrive, in no
+        particular order.  At most two pages per segment are buffered.
+        """
+        # The low level client is thread safe, the resource is not.
+        client = self.resource.meta.client
+        if total_segments <= 1:
+            yield from self._scan_segment(client, params)
+            return
+        pages: Queue = Queue(maxsize=total_segments * 2)
+        stop = Event()
+
+        def put(value) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(value, timeout=0.1)
+                    return True
+                except Full:
+                    pass
+            return False
+
+        def worker(segment: int) -> None:
+            try:
+                for page in self._scan_segment(
+                    client, params, (segment, total_segments)
+                ):
+                    if not put(page):
+                        return
+            except Exception as e:
+                put(e)
+                return
+            put(_SCAN_DONE)
+
+        with ThreadPoolExecutor(max_workers=total_segments) as pool:
+            for segment in range(total_segments):
+                pool.submit(worker, segment)
+            try:
+                remaining = total_segments
+                while remaining:
+                    page = pages.get()
+                    if page is _SCAN_DONE:
+                        remaining -= 1
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield page
+            finally:
+                stop.set()
+
+    async def ascan_pages(
+        self, total_segments: int = 1, **params
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        if total_segments <= 1:
+            async for page in self._ascan_segment(params):
+                yield page
+            return
+        pages: asyncio.Queue = asyncio.Queue(maxsize=total_segments * 2)
+
+        async def worker(segment: int) -> None:
+            try:
+                async for page in self._ascan_segment(
+                    params, (segment, total_segments)
+                ):
+                    await pages.put(page)
+            except Exception as e:
+                await pages.put(e)
+                return
+            await pages.put(_SCAN_DONE)
+
+        tasks = [asyncio.create_task(worker(x)) for x in range(total_segments)]
+        try:
+            remaining = total_segments
+            while remaining:
+                page = await pages.get()
+                if page is _SCAN_DONE:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _scan_segment(
+        self,
+        client,
+        params: dict[str, Any],
+        segment: tuple[int, int] | None = None,
+    ) -> Generator[dict[str, Any], None, None]:
+        request = self._scan_segment_params(params, segment)
+        while True:
+            response = client.scan(**_to_client_params(self.__tablename__, request))
+            response = _from_client_response(response)
+            yield response
+            if not response.get("LastEvaluatedKey"):
+                return
+            request["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    async def _ascan_segment(
+        self,
+        params: dict[str, Any],
+        segment: tuple[int, int] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        request = self._scan_segment_params(params, segment)
+        while True:
+            response = await self._arequest("scan", **request)
+            yield response
+            if not response.get("LastEvaluatedKey"):
+                return
+            request["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    @staticmethod
+    def _scan_segment_params(
+        params: dict[str, Any], segment: tuple[int, int] | None
+    ) -> dict[str, Any]:
+        request = {k: v for k, v in params.items() if v is not None}
+        if segment is not None:
+            request["Segment"], request["TotalSegments"] = segment
+        return request
+
+    def iter_query(
+        self, key_condition_expression: Key | Operators | None, **kwargs
+    ) -> Generator[Item, None, None]:
+        """Stream the items of every page of a query, see `query_pages`."""
+        for page in self.query_pages(key_condition_expression, **kwargs):
+            yield from page.items
+
+    async def aquery_pages(
+        self,
+        key_condition_expression: Key | Operators | None,
+        select: Selections = "ALL_ATTRIBUTES",
+        projection_expression: str | None = None,
+        expression_attribute_names: dict[str, str] | None = None,
+        scan_index_forward: bool = True,
+        page_size: int | None = None,
+        index_name: str | None = None,
+        exclusive_start_key: dict[str, Any] | None = None,
+        max_pages: int | None = None,
+    ) -> AsyncGenerator[QueryResponse[Item], None]:
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            page = await self.aquery(
+                key_condition_expression,
+                select=select,
+                projection_expression=projection_expression,
+                expression_attribute_names=expression_attribute_names,
+                scan_index_forward=scan_index_forward,
+                limit=page_size,
+                index_name=index_name,
+                exclusive_start_key=exclusive_start_key,
+            )
+            pages += 1
+            yield page
+            exclusive_start_key = page.last_evaluated_key
+            if not exclusive_start_key:
+                break
+
+    async def aiter_query(
+        self, key_condition_expression: Key | Operators | None, **kwargs
+    ) -> AsyncGenerator[Item, None]:
+        async for page in self.aquery_pages(key_condition_expression, **kwargs):
+            for item in page.items:
+                yield item
+
+    async def _arequest(self, operation: str, **params) -> dict[str, Any]:
+        """Make a request on this table with the async client.  Parameters and
+        the response use python values, like the boto3 Table resource."""
+        response = await _aclient_call(
+            operation, **_to_client_params(self.__tablename__, params)
+        )
+        return _from_client_response(response)
 
     def delete(self):
         logger.info(f"Deleting table: {self.__tablename__}")
         self.table.delete()
         self._deleted = True
+        with _tables_lock:
+            if _tables.get(type(self)) is self:
+                del _tables[type(self)]
 
     def put_item(self, item: dict):
         return self.table.put_item(Item=item)
 
+    async def aput_item(self, item: dict):
+        return await self._arequest("put_item", Item=item)
+
     @classmethod
     def _get_query_response_from_boto3_response(
         cls, response: Boto3QueryResponseType
     ) -> QueryResponse[Item]:
+        items, resources = cls._item_types()
         for i, item in enumerate(response["Items"]):
-            for key, Item in cls.items():
+            if (Item := resources.get(item.get("Resource"))) is not None:
+                response["Items"][i] = Item(**item)  # type: ignore
+                continue
+            # Items without a Resource discriminator fall back to trial validation
+            for key, Item in items:
                 try:
                     response["Items"][i] = Item(**item)  # type: ignore
                     break
@@ -1,4 +1,5 @@
-from server.database import Table, Item, SortKey, PartitionKey
+from server.database import Table, Item, SortKey, PartitionKey, get_table
+import os
 from shortuuid import uuid
 from pydantic import Field, BaseModel, ValidationError, field_validator, ValidationInfo
 from pydantic.fields import computed_field
@@ -57,8 +58,13 @@ class WorkflowTable(Table):
         ]  # Sort key is set by validator
         Name: str
         Owner: str
+        Revision: int = Field(
+            0, description="Incremented whenever the workflow's content changes"
+        )
         Resource: Literal["Workflow"] = "Workflow"
 
+        __scan_index__ = os.environ.get("DYNAMODB_WORKFLOW_INDEX")
+
         @computed_field
         @cached_property
         def ID(self) -> str:
@@ -103,4 +109,4 @@ class WorkflowTable(Table):
 
 
 def get_workflow_table() -> WorkflowTable:
-    return WorkflowTable()
+    return get_table(WorkflowTable)
@@ -1,12 +1,17 @@
+import asyncio
 import time
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from nodes.catalog import node_catalog
 from server.routers import forms
 from . import models
 from .database import engine
-from .routers import users, nodes, items, workflows
+from .database._nosql import close_async_client
+from .app import watch_nodes
+from .routers import admin, users, nodes, items, workflows
 from pydantic import ValidationError, BaseModel
 import os
 import logging
@@ -21,6 +26,9 @@ level = os.environ.get("LOG_LEVEL", "DEBUG").upper().strip()
 if level not in LOG_LEVELS:
     raise ValueError(f"Invalid log level {level}, must be one of{LOG_LEVELS}")
 
+# Poll node sources for changes every so many seconds, off when unset
+NODES_WATCH_INTERVAL = os.environ.get("NODES_WATCH_INTERVAL")
+
 config = os.environ.get("LOG_CONFIG", os.path.join(ROOT, "log_config.yaml"))
 
 with open(config) as f:
@@ -43,6 +51,33 @@ origin = [
 ]
 
 
+_watcher: asyncio.Task | None = None
+
+
+@app.on_event("startup")
+async def start_node_watcher():
+    global _watcher
+    if NODES_WATCH_INTERVAL:
+        _watcher = asyncio.create_task(watch_nodes(float(NODES_WATCH_INTERVAL)))
+
+
+@app.on_event("shutdown")
+async def stop_node_watcher():
+    if _watcher is not None:
+        _watcher.cancel()
+
+
+@app.on_event("shutdown")
+async def close_database_clients():
+    await close_async_client()
+
+
+@app.on_event("shutdown")
+async def save_node_catalog():
+    # Requests only record schemas in the catalog, it is written out here
+    await run_in_threadpool(node_catalog.save)
+
+
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
@@ -59,6 +94,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Token"],
 )
 
 # @app.exception_handler(ValidationError)
@@ -102,3 +138,4 @@ app.include_router(users.router)
 app.include_router(items.router)
 app.include_router(workflows.router)
 app.include_router(forms.router)
+app.include_router(admin.router)
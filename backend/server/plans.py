@@ -0,0 +1,194 @@
+from copy import deepcopy
+from dataclasses import dataclass
+from logging import getLogger
+from threading import Lock
+from typing import Any, Callable, Iterable, Type
+from nodes.base import Edge, Node
+from nodes.errors import WorkflowEdgeConflictException
+from nodes.workflow import Workflow
+from server.database.tables import WorkflowTable
+
+logger = getLogger(__name__)
+
+__all__ = ["NodePlan", "EdgePlan", "WorkflowPlan", "PlanCache", "plan_cache"]
+
+
+@dataclass(frozen=True)
+class NodePlan:
+    id: str
+    node_class: Type[Node]
+    values: tuple[tuple[str, Any], ...]
+
+
+@dataclass(frozen=True)
+class EdgePlan:
+    source: tuple[str, str]  # (NodeID, Key)
+    target: tuple[str, str]
+    id: str | None = None
+
+
+@dataclass(frozen=True)
+class WorkflowPlan:
+    """Everything needed to run a stored workflow without reading it from the
+    database again: the node classes, their stored data, the wiring and the
+    execution order.  Plans are immutable, each run instantiates a fresh
+    Workflow from the plan."""
+
+    workflow_id: str
+    revision: int
+    nodes: tuple[NodePlan, ...]  # In execution order
+    edges: tuple[EdgePlan, ...]
+
+    @classmethod
+    def compile(
+        cls,
+        workflow_id: str,
+        revision: int,
+        items: Iterable[Any],
+        get_node_class: Callable[[str, int], Type[Node]],
+    ) -> "WorkflowPlan":
+        nodes, edges = cls.item_plans(items, get_node_class)
+        return cls.build(workflow_id, revision, nodes, edges)
+
+    @staticmethod
+    def item_plans(
+        items: Iterable[Any], get_node_class: Callable[[str, int], Type[Node]]
+    ) -> tuple[list[NodePlan], list[EdgePlan]]:
+        """The plans of the nodes and edges among stored workflow items, so a
+        workflow can be read page by page without holding every item."""
+        nodes: list[NodePlan] = []
+        edges: list[EdgePlan] = []
+        for item in items:
+            if isinstance(item, WorkflowTable.Node):
+                values = tuple(
+                    (key, data.Value)
+                    for key, data in item.Data.items()
+                    if data.Value is not None
+                )
+                nodes.append(
+                    NodePlan(
+                        item.ID, get_node_class(item.Address, item.Version), values
+                    )
+                )
+            elif isinstance(item, WorkflowTable.Edge):
+                edges.append(
+                    EdgePlan(
+                        (item.From.NodeID, item.From.Key),
+                        (item.To.NodeID, item.To.Key),
+                        item.ID,
+                    )
+                )
+        return nodes, edges
+
+    @classmethod
+    def build(
+        cls,
+        workflow_id: str,
+        revision: int,
+        nodes: list[NodePlan],
+        edges: list[EdgePlan],
+    ) -> "WorkflowPlan":
+        cls._check_edge_conflicts(edges)
+        # Wiring, compatibility and values are checked once, when the plan is
+        # compiled.  The plan keeps the validated values in execution order.
+        order = cls._checked_workflow(workflow_id, nodes, edges).plan()
+        plans = {x.id: x for x in nodes}
+        validated = [
+            NodePlan(
+                node.id,
+                plans[node.id].node_class,
+                tuple((key, node.data[key].value) for key, _ in plans[node.id].values),
+            )
+            for node in order
+        ]
+        return cls(workflow_id, revision, tuple(validated), tuple(edges))
+
+    @staticmethod
+    def _check_edge_conflicts(edges: Iterable[EdgePlan]) -> None:
+        """Workflows stored before inputs were limited to one edge may have
+        several, they must be fixed by deleting the extra edges."""
+        sources: dict[tuple[str, str], set[tuple[str, str]]] = {}
+        by_target: dict[tuple[str, str], list[EdgePlan]] = {}
+        for edge in edges:
+            sources.setdefault(edge.target, set()).add(edge.source)
+            by_target.setdefault(edge.target, []).append(edge)
+        for target, edge_sources in sources.items():
+            if len(edge_sources) > 1:
+                conflicting = by_target[target]
+                raise WorkflowEdgeConflictException(
+                    f"Input {target[1]} of node {target[0]} has {len(conflicting)} edges, "
+                    f"delete all but one of: {', '.join(str(x.id) for x in conflicting)}",
+                    conflicting,
+                )
+
+    @staticmethod
+    def _checked_workflow(
+        workflow_id: str, nodes: Iterable[NodePlan], edges: Iterable[EdgePlan]
+    ) -> Workflow:
+        workflow = Workflow(workflow_id)
+        instances: dict[str, Node] = {}
+        for node_plan in nodes:
+            node = node_plan.node_class(id=node_plan.id)
+            for key, value in node_plan.values:
+                node.data[key].set(deepcopy(value))
+            instances[node.id] = node
+            workflow.add_node(node)
+        for edge in edges:
+            source_id, source_key = edge.source
+            target_id, target_key = edge.target
+            workflow.add_edge(
+                source=instances[source_id].data[source_key],
+                target=instances[target_id].data[target_key],
+            )
+        return workflow
+
+    def instantiate(self) -> Workflow:
+        """A fresh workflow, only the nodes and their values are allocated, the
+        wiring and execution order are taken from the plan as they are."""
+        instances: dict[str, Node] = {}
+        for node_plan in self.nodes:
+            node = node_plan.node_class(id=node_plan.id)
+            for key, value in node_plan.values:
+                node.data[key].set_validated(deepcopy(value))
+            instances[node.id] = node
+        edges = [
+            Edge(
+                instances[edge.source[0]].data[edge.source[1]],
+                instances[edge.target[0]].data[edge.target[1]],
+            )
+            for edge in self.edges
+        ]
+        return Workflow.from_validated(
+            self.workflow_id, list(instances.values()), edges
+        )
+
+
+class PlanCache:
+    """Compiled workflow plans, keyed by workflow ID and revision."""
+
+    def __init__(self) -> None:
+        self._plans: dict[str, WorkflowPlan] = {}
+        self._lock = Lock()
+
+    def get(self, workflow_id: str, revision: int) -> WorkflowPlan | None:
+        plan = self._plans.get(workflow_id)
+        if plan is not None and plan.revision == revision:
+            return plan
+        return None
+
+    def put(self, plan: WorkflowPlan) -> None:
+        with self._lock:
+            current = self._plans.get(plan.workflow_id)
+            if current is None or current.revision <= plan.revision:
+                self._plans[plan.workflow_id] = plan
+
+    def invalidate(self, workflow_id: str) -> None:
+        with self._lock:
+            self._plans.pop(workflow_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+
+plan_cache = PlanCache()
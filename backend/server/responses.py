@@ -10,4 +10,5 @@ class ErrorResponse(BaseModel):
     detail: str
 
 Error404 = {"description": "The requested resource was not found", "model": ErrorResponse}
+Error409 = {"description": "The request conflicts with the stored resource", "model": ErrorResponse}
 Error500 = {"description": "Internal Server Error", "model": ErrorResponse}
\ No newline at end of file
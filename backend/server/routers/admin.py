@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from server.app import reload_nodes
+from server.responses import Error500
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+class ReloadSchema(BaseModel):
+    Reloaded: list[str]
+
+
+@router.post("/reload", responses={500: Error500})
+async def reload_node_sources() -> ReloadSchema:
+    """Reload node sources whose files changed.  Running workflows keep the
+    node classes they started with."""
+    return ReloadSchema(Reloaded=await run_in_threadpool(reload_nodes))
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from nodes import NodeRegistry, get_node_registry, manager
 from nodes.base import NodeSchema
 from server.database.tables import WorkflowTable
@@ -13,10 +14,6 @@ extra = {}
 async def read_forms(
     registry: NodeRegistry = Depends(get_node_registry),
 ) -> dict[str, NodeSchema]:
-    node_schemas = {
-        f"{addr}:{ver}": data.class_schema()
-        for addr, blob in registry.items()
-        for ver, data in blob.items()
-    }
+    node_schemas = await run_in_threadpool(registry.schemas)
     node_schemas.update(extra)
     return node_schemas
@@ -1,11 +1,13 @@
-from fastapi import APIRouter
-from server.app import get_node_manager, NodeSchema
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from nodes import NodeRegistry, get_node_registry
+from server.app import NodeSchema
 from server.responses import Error500
 
 router = APIRouter(prefix="/nodes", tags=["nodes"])
 
 
 @router.get("/", response_model=list[NodeSchema], responses={500: Error500})
-def get_nodes():
-    nodes = get_node_manager().nodes
-    return [node.class_schema() for node in nodes]
+async def get_nodes(registry: NodeRegistry = Depends(get_node_registry)):
+    schemas = await run_in_threadpool(registry.schemas)
+    return list(schemas.values())
@@ -1,7 +1,9 @@
 from ast import alias
 from logging import getLogger
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from nodes import workflow
+from server.database import encode_start_key, decode_start_key
 from server.database.tables import get_workflow_table, WorkflowTable, WorkflowID, NodeDataID, NodeID  # type: ignore
 from server.utils import omit
 from contextlib import contextmanager
@@ -9,14 +11,16 @@ from pydantic import BaseModel, ValidationError, Field
 from typing import Annotated, Optional, Literal, Any, Type
 from nodes import NodeRegistry, get_node_registry, manager
 from nodes.base import Edge, Node, NodeData, NodeDataTypes
+from nodes.errors import WorkflowEdgeConflictException
 from nodes.workflow import Workflow, WorkflowSchema
 from boto3.dynamodb.conditions import Key, And
-from server.responses import Error404, Error500
+from server.responses import Error404, Error409, Error500
+from server.plans import EdgePlan, NodePlan, WorkflowPlan, plan_cache
 
 logger = getLogger(__name__)
 
 
-@omit("PartitionKey", "SortKey", "WorkflowID", "ID")
+@omit("PartitionKey", "SortKey", "WorkflowID", "ID", "Revision")
 class WorkflowPostRequest(WorkflowTable.Workflow): ...
 
 
@@ -50,12 +54,40 @@ class EdgePostRequest(BaseModel):
 
 router = APIRouter(prefix="/workflows", tags=["workflows"], redirect_slashes=True)
 
+NEXT_TOKEN_HEADER = "X-Next-Token"
 
-def get_workflow_object(
+Limit = Annotated[
+    int | None, Query(ge=1, description="The maximum number of rows to read")
+]
+NextToken = Annotated[
+    str | None,
+    Query(
+        alias="next",
+        description=f"Continue a listing, from the {NEXT_TOKEN_HEADER} header of the previous page",
+    ),
+]
+
+
+def get_start_key(token: str | None) -> dict[str, Any] | None:
+    try:
+        return decode_start_key(token)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def set_next_token(response: Response, last_evaluated_key: dict[str, Any] | None):
+    """List routes return a plain list, the token for the next page, if there
+    is one, is returned in a header."""
+    token = encode_start_key(last_evaluated_key)
+    if token:
+        response.headers[NEXT_TOKEN_HEADER] = token
+
+
+async def get_workflow_object(
     workflow_id: str,
     table: WorkflowTable,
 ) -> WorkflowTable.Workflow:
-    workflow = table.Workflow.get(key=workflow_id, sort_key=workflow_id)
+    workflow = await table.Workflow.aget(key=workflow_id, sort_key=workflow_id)
     if not workflow:
         raise HTTPException(
             status_code=404, detail=f"Workflow not found: {workflow_id}"
@@ -75,12 +107,12 @@ def get_node_class(address: str, version: int, registry: NodeRegistry) -> Type[N
         raise HTTPException(status_code=404, detail=msg)
 
 
-def get_node_object(
+async def get_node_object(
     node_id: str,
     workflow_id: str,
     table: WorkflowTable,
 ) -> WorkflowTable.Node:
-    node = table.Node.get(key=workflow_id, sort_key=node_id)
+    node = await table.Node.aget(key=workflow_id, sort_key=node_id)
     if not node:
         raise HTTPException(
             status_code=404, detail=f"Node not found: {workflow_id}  {node_id}"
@@ -88,12 +120,12 @@ def get_node_object(
     return node
 
 
-def get_edge_object(
+async def get_edge_object(
     edge_id: str,
     workflow_id: str,
     table: WorkflowTable
 ) -> WorkflowTable.Edge:
-    edge = table.Edge.get(key=workflow_id, sort_key=edge_id)
+    edge = await table.Edge.aget(key=workflow_id, sort_key=edge_id)
     if not edge:
         raise HTTPException(
             status_code=404, detail=f"edge not found: {workflow_id}  {edge_id}"
@@ -101,11 +133,46 @@ def get_edge_object(
     return edge
 
 
-def get_node_instance_by_id(
+async def invalidate_workflow(workflow_id: str, table: WorkflowTable) -> None:
+    """Must be called whenever a workflow's nodes, edges or data change.  Bumps
+    the stored revision so that every worker recompiles its execution plan."""
+    plan_cache.invalidate(workflow_id)
+    await table.Workflow.aincrement("Revision", key=workflow_id, sort_key=workflow_id)
+
+
+async def get_node_objects(
+    node_ids: list[str], workflow_id: str, table: WorkflowTable
+) -> list[WorkflowTable.Node]:
+    """Get several nodes of a workflow with a single batch request."""
+    nodes = await table.Node.abatch_get([(workflow_id, node_id) for node_id in node_ids])
+    for node_id, node in zip(node_ids, nodes):
+        if not node:
+            raise HTTPException(
+                status_code=404, detail=f"Node not found: {workflow_id}  {node_id}"
+            )
+    return nodes
+
+
+async def get_node_instance_by_id(
     node_id: str, workflow_id: str, table: WorkflowTable, registry: NodeRegistry
 ) -> Node:
-    node = get_node_object(node_id, workflow_id, table)
-    return get_node_class(node.Address, node.Version, registry)(id=node_id)
+    node = await get_node_object(node_id, workflow_id, table)
+    return await run_in_threadpool(
+        lambda: get_node_class(node.Address, node.Version, registry)(id=node_id)
+    )
+
+
+async def get_node_instances_by_id(
+    node_ids: list[str], workflow_id: str, table: WorkflowTable, registry: NodeRegistry
+) -> list[Node]:
+    nodes = await get_node_objects(node_ids, workflow_id, table)
+    # Node classes may be imported on first use, which blocks
+    return await run_in_threadpool(
+        lambda: [
+            get_node_class(node.Address, node.Version, registry)(id=node.ID)
+            for node in nodes
+        ]
+    )
 
 
 def get_node_data_from_instance(node: Node, key: str) -> NodeData:
@@ -134,17 +201,25 @@ def _set_data_on_node(node: Node, key: str, type: NodeDataTypes, value: Any) ->
 
 
 @router.get("/", response_model=list[WorkflowTable.Workflow], responses={500: Error500})
-def get_workflows(table: WorkflowTable = Depends(get_workflow_table)):
-    scanned_items = table.Workflow.scan()
-    return scanned_items.items
+async def get_workflows(
+    response: Response,
+    limit: Limit = None,
+    next_token: NextToken = None,
+    table: WorkflowTable = Depends(get_workflow_table),
+):
+    if limit is None and next_token is None:
+        return [workflow async for workflow in table.Workflow.aiter_scan()]
+    page = await table.Workflow.ascan(limit=limit, start_key=get_start_key(next_token))
+    set_next_token(response, page.last_evaluated_key)
+    return page.items
 
 
 @router.post("/", response_model=WorkflowTable.Workflow, responses={500: Error500})
-def create_workflow(
+async def create_workflow(
     body: WorkflowPostRequest, table: WorkflowTable = Depends(get_workflow_table)
 ):
     workflow = table.Workflow(**body.model_dump())
-    workflow.put()
+    await workflow.aput()
     return workflow
 
 
@@ -153,36 +228,50 @@ def create_workflow(
     response_model=WorkflowTable.Workflow,
     responses={404: Error404, 500: Error500},
 )
-def get_workflow_by_id(
+async def get_workflow_by_id(
     workflow_id: str, table: WorkflowTable = Depends(get_workflow_table)
 ):
-    workflow = get_workflow_object(workflow_id, table)
+    workflow = await get_workflow_object(workflow_id, table)
     return workflow
 
 
 @router.delete("/{workflow_id}", responses={404: Error404, 500: Error500})
-def delete_workflow_by_id(
+async def delete_workflow_by_id(
     workflow_id: str,
     dryRun: bool = False,
     table: WorkflowTable = Depends(get_workflow_table),
 ) -> list[WorkflowTable.Node | WorkflowTable.Edge | WorkflowTable.Workflow]:
-    get_workflow_object(workflow_id, table)  # Raises 404 if not found
-    response = table.query(Key(table.partition_key.name).eq(workflow_id))
-    for item in response.items:
+    await get_workflow_object(workflow_id, table)  # Raises 404 if not found
+    items: list[Any] = []
+    # Each page is deleted as it is read, the response lists every item
+    async for page in table.aquery_pages(Key(table.partition_key.name).eq(workflow_id)):
+        for item in page.items:
+            logger.debug(
+                f"{'DRY_RUN:  'if dryRun else ''}delete {workflow_id}: Deleted: {item}"
+            )
         if not dryRun:
-            item.delete()
-        logger.debug(
-            f"{'DRY_RUN:  'if dryRun else ''}delete {workflow_id}: Deleted: {item}"
-        )
-    return response.items  # type: ignore
+            await table.abatch_delete(page.items)
+        items.extend(page.items)
+    if not dryRun:
+        plan_cache.invalidate(workflow_id)
+    return items  # type: ignore
 
 
 @router.get("/{workflow_id}/all", responses={404: Error404, 500: Error500})
-def get_all_workflow_elements(
-    workflow_id: str, table: WorkflowTable = Depends(get_workflow_table)
+async def get_all_workflow_elements(
+    workflow_id: str,
+    response: Response,
+    limit: Limit = None,
+    next_token: NextToken = None,
+    table: WorkflowTable = Depends(get_workflow_table),
 ) -> list[WorkflowTable.Workflow | WorkflowTable.Node | WorkflowTable.Edge]:
-    items = table.query(Key(table.partition_key.name).eq(workflow_id))
-    return items.items  # type: ignore
+    page = await table.aquery_page(
+        Key(table.partition_key.name).eq(workflow_id),
+        limit=limit,
+        exclusive_start_key=get_start_key(next_token),
+    )
+    set_next_token(response, page.last_evaluated_key)
+    return page.items  # type: ignore
 
 
 @router.patch(
@@ -190,13 +279,20 @@ def get_all_workflow_elements(
     response_model=WorkflowTable.Workflow,
     responses={404: Error404, 500: Error500},
 )
-def update_workflow_by_id(
+async def update_workflow_by_id(
     workflow_id: str,
     body: WorkflowPatchRequest,
     table: WorkflowTable = Depends(get_workflow_table),
 ):
-    workflow = get_workflow_object(workflow_id, table)
-    workflow.put(**body.model_dump())
+    values = body.model_dump(exclude_none=True)
+    if not values:
+        return await get_workflow_object(workflow_id, table)
+    # Only the given attributes are written, so Revision is never rolled back
+    workflow = await table.Workflow.aupdate(workflow_id, workflow_id, **values)
+    if not workflow:
+        raise HTTPException(
+            status_code=404, detail=f"Workflow not found: {workflow_id}"
+        )
     return workflow
 
 
@@ -205,11 +301,21 @@ def update_workflow_by_id(
     response_model=list[WorkflowTable.Node],
     responses={404: Error404, 500: Error500},
 )
-def get_nodes_by_workflow(
-    workflow_id: str, table: WorkflowTable = Depends(get_workflow_table)
+async def get_nodes_by_workflow(
+    workflow_id: str,
+    response: Response,
+    limit: Limit = None,
+    next_token: NextToken = None,
+    table: WorkflowTable = Depends(get_workflow_table),
 ):
-    response = table.Node.query(key=workflow_id)
-    return response.items
+    page = await table.Node.aquery(
+        key=workflow_id,
+        key_expression=Key(table.sort_key.name).begins_with("Node-"),
+        limit=limit,
+        start_key=get_start_key(next_token),
+    )
+    set_next_token(response, page.last_evaluated_key)
+    return page.items
 
 
 @router.get(
@@ -217,41 +323,45 @@ def get_nodes_by_workflow(
     response_model=WorkflowTable.Node,
     responses={404: Error404, 500: Error500},
 )
-def get_node_by_id(
+async def get_node_by_id(
     workflow_id: str,
     node_id: str,
     table: WorkflowTable = Depends(get_workflow_table),
 ):
-    node = get_node_object(node_id, workflow_id, table)
+    node = await get_node_object(node_id, workflow_id, table)
     return node
 
 
 @router.post("/{workflow_id}/nodes", responses={404: Error404, 500: Error500})
-def add_node_to_workflow(
+async def add_node_to_workflow(
     workflow_id: str,
     body: WorkflowNodePostRequest,
     table: WorkflowTable = Depends(get_workflow_table),
     node_registry: NodeRegistry = Depends(get_node_registry),
 ):
-    get_workflow_object(workflow_id, table)  # Raises 404 if not found
-    node_obj = get_node_class(body.Address, body.Version, registry=node_registry)
+    await get_workflow_object(workflow_id, table)  # Raises 404 if not found
+
+    def node_schema() -> dict[str, Any]:
+        node_obj = get_node_class(body.Address, body.Version, registry=node_registry)
+        return node_obj.class_schema().model_dump()
 
-    node = table.Node(PartitionKey=workflow_id, **node_obj.class_schema().model_dump())
-    node.put()
+    node = table.Node(PartitionKey=workflow_id, **await run_in_threadpool(node_schema))
+    await node.aput()
+    await invalidate_workflow(workflow_id, table)
     return node
 
 
 @router.delete(
     "/{workflow_id}/nodes/{node_id}", responses={404: Error404, 500: Error500}
 )
-def delete_node_from_workflow(
+async def delete_node_from_workflow(
     workflow_id: str, node_id: str, table: WorkflowTable = Depends(get_workflow_table)
 ) -> list[WorkflowTable.Node]:
     expression = And(
         Key(table.partition_key.name).eq(workflow_id),
         Key(table.sort_key.name).begins_with(node_id),
     )
-    items: list[WorkflowTable.Node] = table.query(expression).items  # type: ignore
+    items: list[WorkflowTable.Node] = (await table.aquery(expression)).items  # type: ignore
     nodes = [x for x in items if isinstance(x, table.Node)]
 
     if len(nodes) < 1 or len(nodes) > 1:
@@ -276,83 +386,116 @@ def delete_node_from_workflow(
 
     for item in items:
         logger.debug(f"delete {workflow_id}/{node_id}: Deleted: {item}")
-        item.delete()
+    await table.abatch_delete(items)
+    await invalidate_workflow(workflow_id, table)
 
     return items
 
 
 @router.put("/{workflow_id}/nodes", responses={404: Error404, 500: Error500})
-def update_nodes(
+async def update_nodes(
     workflow_id: str,
     body: list[WorkflowTable.Node],
     table: WorkflowTable = Depends(get_workflow_table),
 ) -> list[WorkflowTable.Node]:
-    workflow = get_workflow_object(workflow_id, table)
+    workflow = await get_workflow_object(workflow_id, table)
     updated: list[WorkflowTable.Node] = []
-    with table.batch_writer() as batch:
-        for node in body:
-            if node.PartitionKey == workflow.ID and node.Resource == "Node":
-                batch.put_item(Item=node)
-                updated.append(node)
-            else:
-                logger.warning(
-                    f"Attempted to update resource that is not a node belonging to {workflow.ID}: {node.PartitionKey}/{node.SortKey}"
-                )
+    for node in body:
+        if node.PartitionKey == workflow.ID and node.Resource == "Node":
+            updated.append(node)
+        else:
+            logger.warning(
+                f"Attempted to update resource that is not a node belonging to {workflow.ID}: {node.PartitionKey}/{node.SortKey}"
+            )
+    await table.abatch_put(updated)
+    await invalidate_workflow(workflow_id, table)
     return updated
 
 @router.post(
     "/{workflow_id}/nodes/{node_id}/data", responses={404: Error404, 500: Error500}
 )
-def set_data_on_node(
+async def set_data_on_node(
     workflow_id: str,
     node_id: str,
     body: NodeDataPostRequest,
     registry: NodeRegistry = Depends(get_node_registry),
     table: WorkflowTable = Depends(get_workflow_table),
 ) -> WorkflowTable.Node:
-    node = get_node_object(node_id, workflow_id, table)
-    instance = get_node_class(node.Address, node.Version, registry=registry)(id=node_id)
-    _set_data_on_node(instance, body.Key, body.Type, body.Data)
+    instance = await get_node_instance_by_id(node_id, workflow_id, table, registry)
+
+    def node_schema() -> dict[str, Any]:
+        _set_data_on_node(instance, body.Key, body.Type, body.Data)
+        return instance.schema().model_dump()
+
     node = WorkflowTable.Node(
-        PartitionKey=workflow_id, SortKey=node_id, **instance.schema().model_dump()
+        PartitionKey=workflow_id, SortKey=node_id, **await run_in_threadpool(node_schema)
     )
-    node.put()
+    await node.aput()
+    await invalidate_workflow(workflow_id, table)
     return node
 
 
-@router.post("/{workflow_id}/edges", responses={404: Error404, 500: Error500})
-def add_edge_to_workflow(
+@router.post(
+    "/{workflow_id}/edges", responses={404: Error404, 409: Error409, 500: Error500}
+)
+async def add_edge_to_workflow(
     workflow_id: str,
     body: EdgePostRequest,
     table: WorkflowTable = Depends(get_workflow_table),
     registry: NodeRegistry = Depends(get_node_registry),
 ) -> WorkflowTable.Edge:
-    from_node = get_node_instance_by_id(body.From.NodeID, workflow_id, table, registry)
-    to_node = get_node_instance_by_id(body.To.NodeID, workflow_id, table, registry)
+    from_node, to_node = await get_node_instances_by_id(
+        [body.From.NodeID, body.To.NodeID], workflow_id, table, registry
+    )
     from_data = get_node_data_from_instance(from_node, body.From.Key)
     to_data = get_node_data_from_instance(to_node, body.To.Key)
-    edge = Edge(from_data, to_data)
+    edges = await table.Edge.aquery(
+        key=workflow_id, key_expression=Key(table.sort_key.name).begins_with("Edge-")
+    )
+    # An input may only have one edge, posting the same edge again is a no-op
+    for existing in edges.items:
+        if (existing.To.NodeID, existing.To.Key) == (body.To.NodeID, body.To.Key):
+            if (existing.From.NodeID, existing.From.Key) == (
+                body.From.NodeID,
+                body.From.Key,
+            ):
+                return existing
+            raise HTTPException(
+                status_code=409,
+                detail=f"Input {body.To.Key} of node {body.To.NodeID} already has an edge: {existing.ID}",
+            )
+    # Checking schema compatibility can take seconds when it is not cached
+    schema = await run_in_threadpool(lambda: Edge(from_data, to_data).schema())
 
-    edge = table.Edge(PartitionKey=workflow_id, **edge.schema().model_dump())
-    edge.put()
+    edge = table.Edge(PartitionKey=workflow_id, **schema.model_dump())
+    await edge.aput()
+    await invalidate_workflow(workflow_id, table)
     return edge
 
 
 @router.get("/{workflow_id}/edges", responses={404: Error404, 500: Error500})
-def get_edges_by_workflow(
-    workflow_id: str, table: WorkflowTable = Depends(get_workflow_table)
+async def get_edges_by_workflow(
+    workflow_id: str,
+    response: Response,
+    limit: Limit = None,
+    next_token: NextToken = None,
+    table: WorkflowTable = Depends(get_workflow_table),
 ) -> list[WorkflowTable.Edge]:
-    response = table.Edge.query(
-        key=workflow_id, key_expression=Key(table.sort_key.name).begins_with("Edge-")
+    page = await table.Edge.aquery(
+        key=workflow_id,
+        key_expression=Key(table.sort_key.name).begins_with("Edge-"),
+        limit=limit,
+        start_key=get_start_key(next_token),
     )
-    return response.items
+    set_next_token(response, page.last_evaluated_key)
+    return page.items
 
 
 @router.get("/{workflow_id}/edges/{edge_id}", responses={404: Error404, 500: Error500})
-def get_edge_by_id(
+async def get_edge_by_id(
     workflow_id: str, edge_id: str, table: WorkflowTable = Depends(get_workflow_table)
 ) -> WorkflowTable.Edge:
-    edge = table.Edge.get(key=workflow_id, sort_key=edge_id)
+    edge = await table.Edge.aget(key=workflow_id, sort_key=edge_id)
     if not edge:
         raise HTTPException(
             status_code=404, detail=f"Edge not found: {workflow_id}/{edge_id}"
@@ -361,59 +504,80 @@ def get_edge_by_id(
 
 
 @router.put("/{workflow_id}/edges", responses={404: Error404, 500: Error500})
-def update_edges(
+async def update_edges(
     workflow_id: str,
     body: list[WorkflowTable.Edge],
     table: WorkflowTable = Depends(get_workflow_table),
 ) -> list[WorkflowTable.Edge]:
-    workflow = get_workflow_object(workflow_id, table)
+    workflow = await get_workflow_object(workflow_id, table)
     updated: list[WorkflowTable.Edge] = []
-    with table.batch_writer() as batch:
-        for edge in body:
-            if edge.PartitionKey == workflow.ID and edge.Resource == "Edge":
-                batch.put_item(Item=edge)
-                updated.append(edge)
-            else:
-                logger.warning(
-                    f"Attempted to update resource that is not an edge belonging to {workflow.ID}: {edge.PartitionKey}/{edge.SortKey}"
-                )
+    for edge in body:
+        if edge.PartitionKey == workflow.ID and edge.Resource == "Edge":
+            updated.append(edge)
+        else:
+            logger.warning(
+                f"Attempted to update resource that is not an edge belonging to {workflow.ID}: {edge.PartitionKey}/{edge.SortKey}"
+            )
+    await table.abatch_put(updated)
+    await invalidate_workflow(workflow_id, table)
     return updated
 
 @router.delete("/{workflow_id}/edges/{edge_id}", responses={404:Error404, 500:Error500})
-def delete_edge_by_id(workflow_id:str, edge_id:str, table: WorkflowTable = Depends(get_workflow_table)) -> WorkflowTable.Edge:
-    edge = get_edge_object(edge_id=edge_id, workflow_id=workflow_id, table=table)
-    edge.delete()
+async def delete_edge_by_id(workflow_id:str, edge_id:str, table: WorkflowTable = Depends(get_workflow_table)) -> WorkflowTable.Edge:
+    edge = await get_edge_object(edge_id=edge_id, workflow_id=workflow_id, table=table)
+    await edge.adelete()
+    await invalidate_workflow(workflow_id, table)
     return edge
 
-@router.post("/{workflow_id}/run", responses={404: Error404, 500: Error500})
-def run_workflow(
+async def get_workflow_plan(
+    workflow_id: str, table: WorkflowTable, registry: NodeRegistry
+) -> WorkflowPlan:
+    workflow = await get_workflow_object(workflow_id, table)  # Raises 404 if not found
+    plan = plan_cache.get(workflow_id, workflow.Revision)
+    if plan is None:
+        logger.debug(f"Compiling plan for {workflow_id} revision {workflow.Revision}")
+        nodes: list[NodePlan] = []
+        edges: list[EdgePlan] = []
+        # Items are only held a page at a time.  Loading node classes and
+        # validating the wiring blocks, so both are kept off the event loop.
+        async for page in table.aquery_pages(
+            Key(table.partition_key.name).eq(workflow_id),
+        ):
+            page_nodes, page_edges = await run_in_threadpool(
+                WorkflowPlan.item_plans,
+                page.items,
+                lambda address, version: get_node_class(address, version, registry),
+            )
+            nodes.extend(page_nodes)
+            edges.extend(page_edges)
+        try:
+            plan = await run_in_threadpool(
+                WorkflowPlan.build, workflow_id, workflow.Revision, nodes, edges
+            )
+        except WorkflowEdgeConflictException as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        plan_cache.put(plan)
+    return plan
+
+
+async def load_workflow(
+    workflow_id: str, table: WorkflowTable, registry: NodeRegistry
+) -> Workflow:
+    plan = await get_workflow_plan(workflow_id, table, registry)
+    return await run_in_threadpool(plan.instantiate)
+
+
+@router.post(
+    "/{workflow_id}/run", responses={404: Error404, 409: Error409, 500: Error500}
+)
+async def run_workflow(
     workflow_id,
     table: WorkflowTable = Depends(get_workflow_table),
     registry: NodeRegistry = Depends(get_node_registry),
 ) -> WorkflowSchema:
-    workflow_data = table.query(
-        Key(table.partition_key.name).eq(workflow_id),
-    )
-    if not workflow_data:
-        raise HTTPException(status_code=404, detail=f"No such workflow: {workflow_id}")
-    workflow = Workflow(workflow_id)
-    nodes: dict[str, Node] = {}
-    for item in workflow_data.items:  # type: ignore
-        if isinstance(item, WorkflowTable.Node):
-            node = get_node_class(item.Address, item.Version, registry)(id=item.ID)
-            for key, data in item.Data.items():
-                if data.Value is not None:
-                    node.data[key].set(data.Value)
-            workflow.add_node(node)
-    for item in workflow_data.items:
-        if isinstance(item, WorkflowTable.Edge):
-            from_node = workflow.get_node_by_id(item.From.NodeID)
-            to_node = workflow.get_node_by_id(item.To.NodeID)
-            workflow.add_edge(
-                source=from_node.data[item.From.Key], target=to_node.data[item.To.Key]
-            )
-    workflow.run()
-    return workflow.schema()
+    workflow = await load_workflow(workflow_id, table, registry)
+    await workflow.arun()
+    return await run_in_threadpool(workflow.schema)
 
 
 #        if isinstance(item, WorkflowTable.NodeData):
@@ -6,10 +6,16 @@ from nodes.builtins.producers import MapProducer, StringProducer, IntProducer
 from nodes.builtins.transforms import StringConcat, ToString
 from pydantic import create_model, Field, BaseModel
 from annotated_types import Len
-from nodes.base import NodeData
+from nodes.base import Node, NodeData
 from typing import Annotated
-from nodes.errors import NodeDataSchemaValidationException, NodeDataNotSetException
+from nodes.errors import (
+    NodeDataSchemaValidationException,
+    NodeDataNotSetException,
+    WorkflowCycleException,
+)
 from unittest import mock
+from threading import Barrier
+import asyncio
 
 
 @pytest.fixture
@@ -23,6 +29,12 @@ def mocked_request():
         yield mocked_get
 
 
+class AsyncUpper(Node):
+    async def run(self, value: str) -> str:
+        await asyncio.sleep(0)
+        return value.upper()
+
+
 class ModelComponent(BaseModel):
     a: int
     b: str
@@ -83,6 +95,144 @@ def test_running_a_multi_node_workflow_using_string_transform(mocked_request):
     mocked_request.assert_called_once_with("1http://example.com", params={}, headers={})
 
 
+def test_parallel_run_executes_independent_branches_concurrently(mocked_request):
+    """Each request waits on a barrier that only opens once all of them are in flight."""
+    barrier = Barrier(4, timeout=5)
+    response = mocked_request.return_value
+
+    def get(*args, **kwargs):
+        barrier.wait()
+        return response
+
+    mocked_request.side_effect = get
+    workflow = Workflow()
+    for i in range(4):
+        producer = StringProducer()
+        request = HTTPGetRequest()
+        workflow.add_node(producer)
+        workflow.add_node(request)
+        workflow.add_edge(producer.output, request.inputs["url"])
+        producer.options["options"].set({"value": f"http://example.com/{i}"})
+    result = workflow.run(parallel=True, max_workers=4)
+    assert result.Status == "Success"
+    assert result.NodesExecuted == 8
+    assert mocked_request.call_count == 4
+
+
+def test_parallel_run_fails_fast(mocked_request):
+    mocked_request.side_effect = ConnectionError("Unreachable")
+    producer = StringProducer()
+    request = HTTPGetRequest()
+    to_string = ToString()
+    workflow = Workflow()
+    for node in [producer, request, to_string]:
+        workflow.add_node(node)
+    workflow.add_edge(producer.output, request.inputs["url"])
+    workflow.add_edge(producer.output, to_string.inputs["value"])
+    producer.options["options"].set({"value": "http://example.com"})
+    result = workflow.run(parallel=True)
+    assert result.Status == "Failed"
+    assert result.FailureDetails
+    assert result.FailureDetails.Class == "ConnectionError"
+    assert 1 <= result.NodesExecuted <= 2
+
+
+def test_arun_mixed_sync_and_async_nodes(mocked_request):
+    producer = StringProducer()
+    upper = AsyncUpper()
+    request = HTTPGetRequest()
+    workflow = Workflow()
+    for node in [producer, upper, request]:
+        workflow.add_node(node)
+    workflow.add_edge(producer.output, upper.inputs["value"])
+    workflow.add_edge(upper.output, request.inputs["url"])
+    producer.options["options"].set({"value": "http://example.com"})
+    result = asyncio.run(workflow.arun())
+    assert result.Status == "Success"
+    assert result.NodesExecuted == 3
+    assert workflow.last_run_details == result
+    mocked_request.assert_called_once_with("HTTP://EXAMPLE.COM", params={}, headers={})
+
+
+def test_arun_fails_fast():
+    workflow = Workflow()
+    producer = StringProducer()
+    upper = AsyncUpper()
+    workflow.add_node(producer)
+    workflow.add_node(upper)
+    workflow.add_edge(producer.output, upper.inputs["value"])
+    result = asyncio.run(workflow.arun())
+    assert result.Status == "Failed"
+    assert result.FailureDetails
+    assert result.FailureDetails.Class == "NodeDataNotSetException"
+    assert result.NodesExecuted == 0
+
+
+def test_arun_awaits_cancelled_nodes_before_returning():
+    cleaned_up = []
+
+    class Failing(Node):
+        async def run(self) -> str:
+            await asyncio.sleep(0)
+            raise ValueError("Failed")
+
+    class Sleeping(Node):
+        async def run(self) -> str:
+            try:
+                await asyncio.sleep(10)
+            finally:
+                await asyncio.sleep(0)
+                cleaned_up.append(True)
+            return "slept"
+
+    workflow = Workflow()
+    workflow.add_node(Failing())
+    workflow.add_node(Sleeping())
+    result = asyncio.run(workflow.arun())
+    assert result.Status == "Failed"
+    assert cleaned_up == [True]
+
+
+def test_validate_only_rechecks_changed_elements():
+    producer = StringProducer()
+    to_string = ToString()
+    workflow = Workflow()
+    workflow.add_node(producer)
+    workflow.add_node(to_string)
+    workflow.add_edge(producer.output, to_string.inputs["value"])
+    with mock.patch.object(
+        Workflow, "_is_compatible", wraps=workflow._is_compatible
+    ) as is_compatible:
+        with pytest.raises(NodeDataNotSetException):
+            workflow.validate()
+        assert is_compatible.call_count == 1
+        with pytest.raises(NodeDataNotSetException):
+            workflow.validate()
+        producer.options["options"].set({"value": "abc"})
+        workflow.validate()
+        assert workflow.run().Status == "Success"
+        assert workflow.run().Status == "Success"
+        assert is_compatible.call_count == 1
+
+
+def test_removed_edges_are_no_longer_validated():
+    producer = StringProducer()
+    to_string = ToString()
+    workflow = Workflow()
+    workflow.add_node(producer)
+    workflow.add_node(to_string)
+    workflow.add_edge(producer.output, to_string.inputs["value"])
+    producer.options["options"].set({"value": "abc"})
+    workflow.validate()
+    workflow._incompatible_edges.update(workflow.edges)
+    with pytest.raises(NodeDataSchemaValidationException):
+        workflow.validate()
+    workflow.remove_edge(next(iter(workflow.edges)))
+    workflow.validate()
+    assert workflow.edges_to(to_string.id) == set()
+    assert workflow.roots == {producer, to_string}
+
+
 def test_get_roots():
     """"""
     workflow = Workflow()
@@ -119,6 +269,105 @@ def test_get_roots_many_producers():
     assert workflow.roots == set(producers)
 
 
+def test_traverse_yields_nodes_in_topological_order():
+    """"""
+    int_producer = IntProducer()
+    string_producer = StringProducer()
+    string_concat = StringConcat()
+    to_string = ToString()
+    workflow = Workflow()
+    for node in [string_concat, to_string, string_producer, int_producer]:
+        workflow.add_node(node)
+    workflow.add_edge(int_producer.output, to_string.inputs["value"])
+    workflow.add_edge(to_string.output, string_concat.inputs["a"])
+    workflow.add_edge(string_producer.output, string_concat.inputs["b"])
+    order = list(workflow.traverse())
+    assert len(order) == 4
+    assert order.index(int_producer) < order.index(to_string)
+    assert order.index(to_string) < order.index(string_concat)
+    assert order.index(string_producer) < order.index(string_concat)
+
+
+def test_plan_is_reused_until_the_graph_changes():
+    """"""
+    workflow = Workflow()
+    producer = StringProducer()
+    to_string = ToString()
+    workflow.add_node(producer)
+    plan = workflow.plan()
+    assert workflow.plan() is plan
+    workflow.add_node(to_string)
+    assert workflow.plan() is not plan
+    plan = workflow.plan()
+    workflow.add_edge(producer.output, to_string.inputs["value"])
+    assert workflow.plan() is not plan
+    assert workflow.plan().downstream[producer] == {to_string}
+
+
+def test_cycles_are_detected_before_any_node_runs():
+    """"""
+    producer = StringProducer()
+    first = ToString()
+    second = ToString()
+    workflow = Workflow()
+    for node in [producer, first, second]:
+        workflow.add_node(node)
+    workflow.add_edge(first.output, second.inputs["value"])
+    workflow.add_edge(second.output, first.inputs["value"])
+    producer.options["options"].set({"value": "abc"})
+    with pytest.raises(WorkflowCycleException) as e:
+        workflow.plan()
+    assert set(e.value.cycle) == {first, second}
+    result = workflow.run()
+    assert result.Status == "Failed"
+    assert result.FailureDetails
+    assert result.FailureDetails.Class == "WorkflowCycleException"
+    assert result.NodesExecuted == 0
+
+
+def test_edges_are_indexed_by_node_data_and_node_id():
+    """"""
+    producer = StringProducer()
+    first = ToString()
+    second = ToString()
+    workflow = Workflow()
+    for node in [producer, first, second]:
+        workflow.add_node(node)
+    workflow.add_edge(producer.output, first.inputs["value"])
+    workflow.add_edge(producer.output, second.inputs["value"])
+    assert len(workflow.edges_from(producer.output)) == 2
+    assert workflow.edges_from(producer.id) == workflow.edges_from(producer.output)
+    assert len(workflow.edges_to(first.inputs["value"])) == 1
+    assert workflow.edges_to(first.id) == workflow.edges_to(first.inputs["value"])
+    assert workflow.edges_from(first.output) == set()
+    assert workflow.roots == {producer}
+
+
+def test_nodes_are_indexed_by_id():
+    """"""
+    producer = StringProducer()
+    workflow = Workflow()
+    workflow.add_node(producer)
+    assert workflow.get_node_by_id(producer.id) is producer
+    with pytest.raises(KeyError):
+        workflow.get_node_by_id("missing")
+
+
+def test_an_input_may_only_have_one_edge():
+    """"""
+    first = StringProducer()
+    second = StringProducer()
+    to_string = ToString()
+    workflow = Workflow()
+    for node in [first, second, to_string]:
+        workflow.add_node(node)
+    workflow.add_edge(first.output, to_string.inputs["value"])
+    workflow.add_edge(first.output, to_string.inputs["value"])  # Same edge, no-op
+    with pytest.raises(AssertionError):
+        workflow.add_edge(second.output, to_string.inputs["value"])
+    assert len(workflow.edges) == 1
+
+
 @pytest.mark.parametrize(
     "annotation_a, annotation_b, expected",
     [
@@ -47,3 +47,24 @@ def test_get_option_params_from_initialized_object():
 
 def test_infer_data_type_of_set_option():
     node = TestNode()
+
+
+def test_signature_and_adapters_are_shared_between_instances():
+    first = TestNode()
+    second = TestNode()
+    assert TestNode._signature() is TestNode._signature()
+    for key in first.data:
+        assert first.data[key].adapter is second.data[key].adapter
+        assert first.data[key] is not second.data[key]
+        assert first.data[key].node is first
+
+
+def test_signature_is_not_inherited_by_subclasses():
+    class SubNode(TestNode):
+        def run(self, custom_option_label: TestNode.Options, c: float) -> float:
+            return c
+
+    assert "a" in TestNode._get_input_params()
+    inputs = SubNode._get_input_params()
+    assert list(inputs) == ["c"]
+    assert SubNode._signature() is not TestNode._signature()
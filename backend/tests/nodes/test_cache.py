@@ -0,0 +1,83 @@
+import pytest
+from unittest import mock
+from nodes.base import Node
+from nodes.cache import LRUCache, MISSING, result_cache
+from nodes.builtins.transforms import StringConcat
+from pydantic import BaseModel
+
+
+class CountingNode(Node):
+    __cacheable__ = True
+    calls = 0
+
+    class Options(BaseModel):
+        suffix: str = ""
+
+    def run(self, value: str, options: Options) -> str:
+        CountingNode.calls += 1
+        return value + options.suffix
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    result_cache.clear()
+    CountingNode.calls = 0
+    yield
+    result_cache.clear()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_lru_cache_expires_entries_after_ttl():
+    cache = LRUCache(maxsize=2, ttl=10)
+    with mock.patch("nodes.cache.monotonic", return_value=100):
+        cache.set("a", 1)
+    with mock.patch("nodes.cache.monotonic", return_value=109):
+        assert cache.get("a") == 1
+    with mock.patch("nodes.cache.monotonic", return_value=110):
+        assert cache.get("a") is MISSING
+    assert len(cache) == 0
+
+
+def test_lru_cache_evicts_matching_keys():
+    cache = LRUCache(maxsize=4)
+    for key in [("a", 1), ("a", 2), ("b", 1)]:
+        cache.set(key, 0)
+    assert cache.evict(lambda key: key[0] == "a") == 2
+    assert list(dict(cache.items())) == [("b", 1)]
+
+
+def test_cacheable_node_results_are_reused():
+    assert CountingNode().call(value="a", options={"suffix": "!"}) == "a!"
+    assert CountingNode().call(value="a", options={"suffix": "!"}) == "a!"
+    assert CountingNode.calls == 1
+    assert CountingNode().call(value="a", options={"suffix": "?"}) == "a?"
+    assert CountingNode().call(value="b", options={"suffix": "!"}) == "b!"
+    assert CountingNode.calls == 3
+    assert (result_cache.hits, result_cache.misses) == (1, 3)
+
+
+def test_nodes_are_not_cached_by_default():
+    with mock.patch.object(CountingNode, "__cacheable__", False):
+        CountingNode().call(value="a")
+        CountingNode().call(value="a")
+    assert CountingNode.calls == 2
+    assert len(result_cache) == 0
+
+
+def test_builtin_transform_results_are_cached():
+    assert StringConcat.__cacheable__
+    StringConcat().call(a="a", b="b", options={"delimiter": "-"})
+    with mock.patch.object(StringConcat, "run") as run:
+        assert StringConcat().call(a="a", b="b", options={"delimiter": "-"}) == "a-b"
+        run.assert_not_called()
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+from unittest import mock
+from nodes.compatibility import SchemaCompatibilityCache, schema_hash
+
+INT = {"type": "integer"}
+NUMBER = {"type": "number"}
+STR = {"type": "string"}
+STR_OR_INT = {"anyOf": [STR, INT]}
+
+
+def test_schema_hash_ignores_key_order():
+    a = {"type": "object", "properties": {"a": INT, "b": NUMBER}}
+    b = {"properties": {"b": NUMBER, "a": INT}, "type": "object"}
+    assert schema_hash(a) == schema_hash(b)
+    assert schema_hash(a) != schema_hash(INT)
+
+
+def test_compatibility_results_are_cached():
+    cache = SchemaCompatibilityCache()
+    with mock.patch("jsonsubschema.isSubschema", return_value=True) as check:
+        assert cache.is_subschema(INT, NUMBER)
+        assert cache.is_subschema(dict(INT), dict(NUMBER))
+        assert check.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_compatibility_results_are_directional():
+    cache = SchemaCompatibilityCache()
+    assert cache.is_subschema(STR, STR_OR_INT) is True
+    assert cache.is_subschema(STR_OR_INT, STR) is False
+
+
+def test_compatibility_cache_persists_to_disk(tmp_path):
+    path = str(tmp_path / "compatibility.json")
+    cache = SchemaCompatibilityCache()
+    cache.is_subschema(STR, STR_OR_INT)
+    cache.save(path)
+    loaded = SchemaCompatibilityCache()
+    loaded.load(path)
+    with mock.patch("jsonsubschema.isSubschema") as check:
+        assert loaded.is_subschema(STR, STR_OR_INT) is True
+        check.assert_not_called()
+
+
+def test_compatibility_cache_is_only_saved_when_changed(tmp_path):
+    path = str(tmp_path / "compatibility.json")
+    cache = SchemaCompatibilityCache()
+    cache.save(path)
+    assert not os.path.exists(path)
+    cache.is_subschema(STR, STR_OR_INT)
+    cache.save(path)
+    assert os.listdir(tmp_path) == ["compatibility.json"]
+    with mock.patch("os.replace") as replace:
+        cache.save(path)
+        cache.is_subschema(STR, STR_OR_INT)  # Already cached
+        cache.save(path)
+        replace.assert_not_called()
+
+
+def test_jsonsubschema_is_patched_once_by_concurrent_first_callers():
+    # A fresh interpreter, so the patches are not applied yet
+    code = (
+        "from concurrent.futures import ThreadPoolExecutor\n"
+        "from nodes.patches import get_jsonsubschema\n"
+        "with ThreadPoolExecutor(4) as pool:\n"
+        "    list(pool.map(lambda _: get_jsonsubschema(), range(4)))\n"
+        "print(get_jsonsubschema().isSubschema(\n"
+        "    {'type': 'integer', 'exclusiveMaximum': 5},\n"
+        "    {'type': 'integer', 'maximum': 2},\n"
+        "))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -1,5 +1,12 @@
 import os
+import subprocess
+import sys
+import threading
+import time
 import pytest
+from unittest import mock
+from nodes.base import Node, clear_schema_cache
+from nodes.catalog import NodeCatalog
 from nodes.manager import NodeManager, File
 
 USER_NODES = os.path.join(os.path.dirname(__file__), "user_nodes", "user_nodes.py")
@@ -19,7 +26,7 @@ def test_add_user_source_from_file(manager):
     assert len(manager.sources) == 1
     original_nodes_len = len(manager.nodes)
     manager.add_source(USER_NODES)
-    assert len(manager.sources) == 2 
+    assert len(manager.sources) == 2
     user_node_source = [x for x in manager.sources if x.source == USER_NODES][0]
     assert isinstance(user_node_source, File)
     assert len(manager.nodes) > original_nodes_len
@@ -30,3 +37,274 @@ def test_get_node_by_id(manager):
     manager.add_source(USER_NODES)
     node = manager.get_node_by_id("user_nodes.UserNode")
     assert node.label() == "UserNode"
+
+
+def test_get_node_by_id_of_added_node(manager):
+    class AddedNode(Node):
+        def run(self) -> str:
+            return "added"
+
+    manager.add_node(AddedNode)
+    assert manager.get_node_by_id(AddedNode.address()) is AddedNode
+    with pytest.raises(ValueError):
+        manager.get_node_by_id("missing.Node")
+
+
+def test_source_index_matches_resolved_nodes(manager):
+    manager.add_source(USER_NODES)
+    for source in manager.sources:
+        indexed = {address: x.version for address, x in source.index.items()}
+        assert indexed == {x.address(): x.__version__ for x in source.nodes}
+
+
+def test_file_sources_are_imported_on_first_use(tmp_path):
+    path = tmp_path / "lazy_user_nodes.py"
+    path.write_text(
+        "from nodes.base import Node\n"
+        "class LazyNode(Node):\n"
+        "    __version__ = 2\n"
+        "    def run(self) -> str:\n"
+        "        return 'lazy'\n"
+        "class LazierNode(LazyNode):\n"
+        "    pass\n"
+    )
+    manager = NodeManager()
+    manager.add_source(str(path))
+    registry = manager.registry()
+    assert "lazy_user_nodes" not in sys.modules
+    assert list(registry["lazy_user_nodes.LazierNode"]) == [2]
+    node = registry["lazy_user_nodes.LazyNode"][2]
+    assert "lazy_user_nodes" in sys.modules
+    assert node.label() == "LazyNode"
+
+
+def test_index_follows_imported_node_bases(tmp_path):
+    path = tmp_path / "imported_base_user_nodes.py"
+    path.write_text(
+        "import nodes.base\n"
+        "from nodes.base import Node as BaseNode\n"
+        "from nodes.builtins import StringProducer\n"
+        "class AliasedNode(BaseNode):\n"
+        "    def run(self) -> str:\n"
+        "        return 'aliased'\n"
+        "class QualifiedNode(nodes.base.Node):\n"
+        "    def run(self) -> str:\n"
+        "        return 'qualified'\n"
+        "class MyProducer(StringProducer):\n"
+        "    pass\n"
+    )
+    manager = NodeManager()
+    manager.add_source(str(path))
+    source = [x for x in manager.sources if x.source == str(path)][0]
+    # Imported nodes that are not subclassed are indexed by their own source
+    resolved = {x.address(): x.__version__ for x in source.nodes}
+    assert {a: x.version for a, x in source.index.items()}.items() <= resolved.items()
+    registry = manager.registry()
+    for name in ["AliasedNode", "QualifiedNode", "MyProducer"]:
+        assert f"imported_base_user_nodes.{name}" in registry
+
+
+def test_registry_resolves_nodes_the_index_cannot_see(tmp_path):
+    path = tmp_path / "dynamic_user_nodes.py"
+    path.write_text(
+        "import sys\n"
+        "from nodes.base import Node\n"
+        "if sys.version_info >= (3,):\n"
+        "    class ConditionalNode(Node):\n"
+        "        def run(self) -> str:\n"
+        "            return 'conditional'\n"
+        "def make_node(name):\n"
+        "    class FactoryNode(Node):\n"
+        "        def run(self) -> str:\n"
+        "            return name\n"
+        "    FactoryNode.__name__ = FactoryNode.__qualname__ = name\n"
+        "    return FactoryNode\n"
+        "MadeNode = make_node('MadeNode')\n"
+    )
+    manager = NodeManager(catalog=None, sources=[str(path)])
+    registry = manager.registry()
+    assert "dynamic_user_nodes.ConditionalNode" in registry
+    assert "dynamic_user_nodes.MadeNode" in registry
+    node = registry["dynamic_user_nodes.MadeNode"][0]
+    assert node().call() == "MadeNode"
+    assert "dynamic_user_nodes.MadeNode:0" in registry.schemas()
+
+
+def test_importing_nodes_defers_heavy_dependencies():
+    code = (
+        "import sys, nodes\n"
+        "nodes.get_node_registry()\n"
+        "print(sorted({'jsonsubschema', 'jsonschema', 'requests'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_catalog_serves_unchanged_files_without_importing(tmp_path):
+    path = tmp_path / "catalog_user_nodes.py"
+    path.write_text(
+        "from nodes.base import Node\n"
+        "class CatalogNode(Node):\n"
+        "    def run(self, value: int) -> int:\n"
+        "        return value\n"
+    )
+
+    def schemas():
+        manager = NodeManager(catalog=NodeCatalog(str(tmp_path / "catalog.json")))
+        manager.add_source(str(path))
+        schemas = manager.registry().schemas()
+        manager.catalog.save()  # As on exit
+        return schemas
+
+    first = schemas()
+    assert "catalog_user_nodes.CatalogNode:0" in first
+    del sys.modules["catalog_user_nodes"]
+
+    assert schemas() == first
+    assert "catalog_user_nodes" not in sys.modules
+
+    path.write_text(
+        path.read_text() + "class OtherCatalogNode(CatalogNode):\n    __version__ = 1\n"
+    )
+    assert "catalog_user_nodes.OtherCatalogNode:1" in schemas()
+    assert "catalog_user_nodes" in sys.modules
+
+
+def test_catalog_save_leaves_no_temporary_files(tmp_path):
+    catalog = NodeCatalog(str(tmp_path / "catalog.json"))
+    catalog.put_index("source", [USER_NODES], {})
+    catalog.save()
+    assert os.listdir(tmp_path) == ["catalog.json"]
+
+    catalog.put_index("other", [USER_NODES], {})
+    with mock.patch("json.dump", side_effect=OSError("No space left on device")):
+        with pytest.raises(OSError):
+            catalog.save()
+    assert os.listdir(tmp_path) == ["catalog.json"]
+
+
+def test_catalog_schemas_follow_base_classes_in_other_files(tmp_path, monkeypatch):
+    package = tmp_path / "catpkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("from .child import Child\n")
+    (package / "child.py").write_text(
+        "from .base_node import Parent\nclass Child(Parent):\n    pass\n"
+    )
+    base_node = package / "base_node.py"
+    base_node.write_text(
+        "from nodes.base import Node\n"
+        "class Parent(Node):\n"
+        "    def run(self, value: str) -> str:\n"
+        "        return value\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def child_data():
+        for module in ["catpkg", "catpkg.child", "catpkg.base_node"]:
+            sys.modules.pop(module, None)
+        clear_schema_cache()  # As a new process would
+        manager = NodeManager(catalog=NodeCatalog(str(tmp_path / "catalog.json")))
+        manager.add_source("catpkg")
+        schemas = manager.registry().schemas()
+        manager.catalog.save()  # As on exit
+        return set(schemas["catpkg.child.Child:0"].Data)
+
+    assert child_data() == {"value", "output"}
+    base_node.write_text(
+        base_node.read_text().replace("value: str)", "value: str, extra: str)")
+    )
+    assert child_data() == {"value", "extra", "output"}
+
+
+def test_reload_swaps_in_changed_sources(tmp_path):
+    path = tmp_path / "reloaded_user_nodes.py"
+    path.write_text(
+        "from nodes.base import Node\n"
+        "class ReloadedNode(Node):\n"
+        "    def run(self) -> str:\n"
+        "        return 'before'\n"
+    )
+    manager = NodeManager()
+    manager.add_source(str(path))
+    registry = manager.registry()
+    before = manager.get_node_by_id("reloaded_user_nodes.ReloadedNode")
+    assert manager.reload() == []
+    assert manager.registry() is registry
+
+    path.write_text(path.read_text().replace("'before'", "'after, reloaded'"))
+    assert manager.reload() == [str(path)]
+    assert manager.registry() is not registry
+    after = manager.registry()["reloaded_user_nodes.ReloadedNode"][0]
+    assert after is not before
+    assert after().call() == "after, reloaded"
+    # Nodes in use keep the class they were created from
+    assert before().call() == "before"
+
+
+def test_reload_drops_cached_results_of_changed_nodes(tmp_path):
+    path = tmp_path / "cached_user_nodes.py"
+    path.write_text(
+        "from nodes.base import Node\n"
+        "class CachedNode(Node):\n"
+        "    __cacheable__ = True\n"
+        "    def run(self, value: str) -> str:\n"
+        "        return value + '!'\n"
+    )
+    manager = NodeManager()
+    manager.add_source(str(path))
+    before = manager.get_node_by_id("cached_user_nodes.CachedNode")
+    assert before().call(value="a") == "a!"
+
+    path.write_text(path.read_text().replace("'!'", "'??'"))
+    manager.reload()
+    after = manager.get_node_by_id("cached_user_nodes.CachedNode")
+    assert after().call(value="a") == "a??"
+
+
+def test_add_sources_skips_broken_sources(manager, tmp_path):
+    broken = tmp_path / "broken_user_nodes.py"
+    broken.write_text("raise RuntimeError('broken')\nclass Broken(\n")
+    timings = manager.add_sources([USER_NODES, str(broken)])
+    assert list(timings) == [USER_NODES]
+    assert USER_NODES in [x.source for x in manager.sources]
+    assert str(broken) not in [x.source for x in manager.sources]
+
+
+def test_discover_sources(monkeypatch):
+    from nodes import manager as nodes_manager
+
+    entry_point = mock.Mock(module="plugin_nodes")
+    monkeypatch.setattr(nodes_manager, "entry_points", lambda group: [entry_point])
+    monkeypatch.setattr(nodes_manager, "NODES_SOURCES", os.pathsep.join([USER_NODES]))
+    assert nodes_manager.discover_sources() == [
+        "nodes.builtins",
+        "plugin_nodes",
+        USER_NODES,
+    ]
+
+
+def test_slow_sources_are_added_when_done(manager, monkeypatch):
+    from nodes import manager as nodes_manager
+
+    loaded = threading.Event()
+    factory = nodes_manager.source_factory
+
+    def slow_factory(source, catalog=None):
+        loaded.wait(5)
+        return factory(source, catalog)
+
+    monkeypatch.setattr(nodes_manager, "source_factory", slow_factory)
+    assert manager.add_sources([USER_NODES], timeout=0.01) == {}
+    assert len(manager.nodes) > 0  # Safe to read while the source is loading
+    loaded.set()
+    for _ in range(100):
+        if USER_NODES in [x.source for x in manager.sources]:
+            break
+        time.sleep(0.05)
+    assert "user_nodes.UserNode" in manager.registry()
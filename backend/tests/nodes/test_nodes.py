@@ -1,10 +1,12 @@
+import asyncio
 import os
 import pytest
 from pydantic import BaseModel, PydanticUserError, ValidationError
 from nodes.manager import NodeManager
 from contextlib import contextmanager
 from inspect import isclass
-from nodes.base import Node
+from nodes.base import Node, clear_schema_cache
+from unittest import mock
 
 USER_NODES = os.path.join(os.path.dirname(__file__), "user_nodes", "user_nodes.py")
 
@@ -159,3 +161,62 @@ def test_user_node_with_multiple_options_get_schema_has_docstring_details(manage
     assert schema.Data["a"].Schema["description"] == "The a parameter"
     assert "description" in schema.Data["output"].Schema
     assert "default" in schema.Data["c"].Schema
+
+
+def test_call_async_user_node(manager):
+    manager.add_source(USER_NODES)
+    node = manager.get_node_by_id("user_nodes.AsyncUserNode")
+    node = node()
+    output = node.call(input={"a": "test", "b": 1, "c": 1.0})
+    assert output.x == "test"
+    assert output.y == 1
+    assert output.z == 1.0
+
+
+def test_call_async_user_node_inside_running_loop(manager):
+    manager.add_source(USER_NODES)
+    node = manager.get_node_by_id("user_nodes.AsyncUserNode")()
+
+    async def call():
+        return node.call(input={"a": "test", "b": 1, "c": 1.0})
+
+    output = asyncio.run(call())
+    assert output.x == "test"
+
+
+@pytest.mark.parametrize(
+    "node_id", ["user_nodes.AsyncUserNode", "user_nodes.UserNodeNoOptions"]
+)
+def test_acall_sync_and_async_user_nodes(manager, node_id):
+    manager.add_source(USER_NODES)
+    node = manager.get_node_by_id(node_id)
+    node = node()
+    output = asyncio.run(node.acall(input={"a": "test", "b": 1, "c": 1.0}))
+    assert output.x == "test"
+    assert node.output.value == output
+
+
+def test_class_schema_is_cached_and_copied(UserNode):
+    clear_schema_cache()
+    with mock.patch.object(
+        UserNode, "_build_data_schema", wraps=UserNode._build_data_schema
+    ) as build:
+        schema = UserNode.class_schema()
+        schema.Data["input"].Schema["title"] = "Changed"
+        assert UserNode.class_schema().Data["input"].Schema.get("title") != "Changed"
+        assert build.call_count == 1
+        clear_schema_cache(UserNode.address())
+        UserNode.class_schema()
+        assert build.call_count == 2
+
+
+def test_instance_schema_overlays_values_on_class_schema(UserNode):
+    node = UserNode()
+    node.options["options"].set({"test_option": True})
+    schema = node.schema()
+    assert schema.Data["options"].Value.test_option is True
+    assert schema.Data["input"].Value is None
+    assert (
+        schema.Data["options"].Schema == UserNode.class_schema().Data["options"].Schema
+    )
+    assert UserNode.class_schema().Data["options"].Value is None
@@ -1,3 +1,4 @@
+import asyncio
 from nodes.base import Node
 from pydantic import Field, BaseModel
 
@@ -64,3 +65,9 @@ class UserNodeWithMissingAnnotation(Node):
 class UserNodeWithNoInputsOrOptions(Node):
     def run(self):
         return None
+
+
+class AsyncUserNode(Node):
+    async def run(self, input: Input) -> Output:
+        await asyncio.sleep(0)
+        return Output(x=input.a, y=input.b, z=input.c)
@@ -0,0 +1,60 @@
+"""Round trips against DynamoDB Local, see ddb.bat.  Skipped when it is not
+running at DYNAMODB_DATABASE_URL."""
+
+import asyncio
+import socket
+import pytest
+from urllib.parse import urlparse
+from shortuuid import uuid
+from server.database import Table, Item, PartitionKey, SortKey
+from server.database._nosql import DYNAMODB_DATABASE_URL, close_async_client
+
+
+def dynamodb_local_is_running() -> bool:
+    url = urlparse(DYNAMODB_DATABASE_URL)
+    try:
+        with socket.create_connection((url.hostname, url.port or 80), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(
+    not dynamodb_local_is_running(), reason="DynamoDB Local is not running"
+)
+
+
+class AsyncTestTable(Table):
+    __tablename__ = "AsyncTestTable"
+    partition_key = PartitionKey("PartitionKey", "S")
+    sort_key = SortKey("SortKey", "S")
+
+    class Row(Item):
+        PartitionKey: str
+        SortKey: str
+        Value: int = 0
+
+
+@pytest.fixture(scope="module")
+def table():
+    table = AsyncTestTable()
+    yield table
+    table.delete()
+
+
+def test_async_round_trip(table):
+    key = f"Test-{uuid()}"
+
+    async def round_trip():
+        rows = [table.Row(PartitionKey=key, SortKey=f"Row-{i}") for i in range(30)]
+        await rows[0].aput()
+        assert await table.Row.aincrement("Value", key, "Row-0") == 1
+        await table.abatch_put(rows[1:])
+        found = await table.Row.abatch_get([(key, "Row-1"), (key, "Missing")])
+        assert [x and x.SortKey for x in found] == ["Row-1", None]
+        assert len((await table.Row.aquery(key)).items) == 30
+        await table.Row.abatch_delete(rows)
+        assert await table.Row.aget(key, "Row-0") is None
+        await close_async_client()
+
+    asyncio.run(round_trip())
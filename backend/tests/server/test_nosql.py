@@ -0,0 +1,377 @@
+import asyncio
+import json
+import pytest
+import threading
+from decimal import Decimal
+from unittest import mock
+from boto3.dynamodb.conditions import Key
+from server.database import (
+    clear_tables,
+    refresh_tables,
+    encode_start_key,
+    decode_start_key,
+)
+from server.database._nosql import (
+    DYNAMODB_MAX_POOL_CONNECTIONS,
+    PAGE_MIN_SIZE,
+    _to_client_params,
+    get_service_resource,
+    to_dynamodb,
+)
+from server.database.tables import WorkflowTable, get_workflow_table
+
+WORKFLOW_ID = "Workflow-" + "a" * 22
+
+
+def workflow_row(i: int) -> dict:
+    id = f"Workflow-{str(i).rjust(22, 'a')}"
+    return {
+        "PartitionKey": id,
+        "SortKey": id,
+        "Name": f"Workflow {i}",
+        "Owner": "owner",
+        "Resource": "Workflow",
+    }
+
+
+def page(items: list[dict], last_key: dict | None = None) -> dict:
+    response = {
+        "Items": items,
+        "Count": len(items),
+        "ScannedCount": len(items),
+        "ResponseMetadata": {},
+    }
+    if last_key:
+        response["LastEvaluatedKey"] = last_key
+    return response
+
+
+@pytest.fixture
+def client():
+    """The mocked low level client of the calling thread."""
+    resource = mock.MagicMock()
+    with mock.patch(
+        "server.database._nosql.get_service_resource", return_value=resource
+    ):
+        yield resource.meta.client
+
+
+@pytest.fixture
+def table():
+    """A WorkflowTable backed by a mocked boto3 Table resource."""
+    table = WorkflowTable.__new__(WorkflowTable)
+    table._local = threading.local()
+    table._deleted = False
+    table._table = mock.MagicMock()
+    table._apply_table_to_items()
+    return table
+
+
+def test_query_pages_follows_last_evaluated_key(table, client):
+    table._table.query.side_effect = [
+        page([workflow_row(1)], {"PartitionKey": "1"}),
+        page([workflow_row(2)], {"PartitionKey": "2"}),
+        page([workflow_row(3)]),
+    ]
+    items = list(table.iter_query(Key("PartitionKey").eq(WORKFLOW_ID), page_size=1))
+    assert [x.Name for x in items] == ["Workflow 1", "Workflow 2", "Workflow 3"]
+    calls = table._table.query.call_args_list
+    assert "ExclusiveStartKey" not in calls[0].kwargs
+    assert calls[1].kwargs["ExclusiveStartKey"] == {"PartitionKey": "1"}
+    assert calls[2].kwargs["ExclusiveStartKey"] == {"PartitionKey": "2"}
+    assert all(call.kwargs["Limit"] == 1 for call in calls)
+
+
+def test_query_pages_are_requested_lazily(table, client):
+    table._table.query.side_effect = [
+        page([workflow_row(1)], {"PartitionKey": "1"}),
+        page([workflow_row(2)]),
+    ]
+    pages = table.query_pages(Key("PartitionKey").eq(WORKFLOW_ID))
+    assert next(pages).items[0].Name == "Workflow 1"
+    assert table._table.query.call_count == 1
+    assert (
+        len(list(table.query_pages(Key("PartitionKey").eq(WORKFLOW_ID), max_pages=1)))
+        == 1
+    )
+
+
+def test_items_are_decoded_by_resource(table, client):
+    node = WorkflowTable.Node(
+        PartitionKey=WORKFLOW_ID,
+        Label="Node",
+        Description="",
+        Address="a.Node",
+        Group=None,
+        SubGroup=None,
+        Version=0,
+        Data={},
+    )
+    rows = [workflow_row(1), node.model_dump()]
+    table._table.query.return_value = page(rows)
+    with mock.patch.object(
+        WorkflowTable.Edge, "__init__", side_effect=AssertionError
+    ) as edge_init:
+        items = table.query(Key("PartitionKey").eq(WORKFLOW_ID)).items
+        edge_init.assert_not_called()
+    assert isinstance(items[0], WorkflowTable.Workflow)
+    assert isinstance(items[1], WorkflowTable.Node)
+    assert dict(WorkflowTable.items()).keys() == {"Workflow", "Node", "Edge"}
+
+
+def test_batch_delete_sends_chunks_of_25_and_retries_unprocessed(table, client):
+    unprocessed = {"Workflows": ["unprocessed"]}
+    client.batch_write_item.side_effect = [
+        {"UnprocessedItems": unprocessed},
+        {"UnprocessedItems": {}},
+        {},
+    ]
+    keys = [{"PartitionKey": WORKFLOW_ID, "SortKey": f"Edge-{i}"} for i in range(30)]
+    with mock.patch("server.database._nosql.time.sleep"):
+        table.batch_delete(keys, max_concurrency=1)
+    calls = client.batch_write_item.call_args_list
+    assert len(calls[0].kwargs["RequestItems"]["Workflows"]) == 25
+    assert calls[0].kwargs["RequestItems"]["Workflows"][0] == {
+        "DeleteRequest": {
+            "Key": {"PartitionKey": {"S": WORKFLOW_ID}, "SortKey": {"S": "Edge-0"}}
+        }
+    }
+    assert calls[1].kwargs["RequestItems"] == unprocessed
+    assert len(calls[2].kwargs["RequestItems"]["Workflows"]) == 5
+
+
+def test_batch_get_preserves_order_and_retries_unprocessed(table, client):
+    ids = [f"Workflow-{str(i).rjust(22, 'a')}" for i in range(3)]
+    unprocessed = {"Workflows": {"Keys": ["unprocessed"]}}
+    client.batch_get_item.side_effect = [
+        {
+            "Responses": {
+                "Workflows": [
+                    {
+                        k: {"S": v} if isinstance(v, str) else v
+                        for k, v in workflow_row(2).items()
+                    }
+                ]
+            },
+            "UnprocessedKeys": unprocessed,
+        },
+        {
+            "Responses": {
+                "Workflows": [
+                    {
+                        k: {"S": v} if isinstance(v, str) else v
+                        for k, v in workflow_row(0).items()
+                    }
+                ]
+            }
+        },
+    ]
+    with mock.patch("server.database._nosql.time.sleep"):
+        workflows = table.Workflow.batch_get([(id, id) for id in ids])
+    assert [w and w.Name for w in workflows] == ["Workflow 0", None, "Workflow 2"]
+    calls = client.batch_get_item.call_args_list
+    assert len(calls[0].kwargs["RequestItems"]["Workflows"]["Keys"]) == 3
+    assert "ProjectionExpression" in calls[0].kwargs["RequestItems"]["Workflows"]
+    assert calls[1].kwargs["RequestItems"] == unprocessed
+
+
+def test_batch_get_sends_chunks_of_100(table, client):
+    client.batch_get_item.return_value = {"Responses": {}}
+    ids = [f"Workflow-{str(i).rjust(22, 'a')}" for i in range(150)]
+    assert table.Workflow.batch_get([(id, id) for id in ids]) == [None] * 150
+    calls = client.batch_get_item.call_args_list
+    assert [len(c.kwargs["RequestItems"]["Workflows"]["Keys"]) for c in calls] == [
+        100,
+        50,
+    ]
+
+
+def test_table_handles_are_resolved_once_with_describe_table():
+    resource = mock.MagicMock()
+    resource.meta.client.describe_table.return_value = {
+        "Table": {"TableName": "Workflows"}
+    }
+    with mock.patch(
+        "server.database._nosql.get_service_resource", return_value=resource
+    ):
+        clear_tables()
+        try:
+            table = get_workflow_table()
+            assert get_workflow_table() is table
+            assert table.Workflow.__table__ is table
+            resource.meta.client.describe_table.assert_called_once_with(
+                TableName="Workflows"
+            )
+            resource.tables.all.assert_not_called()
+            refresh_tables()
+            assert resource.meta.client.describe_table.call_count == 2
+        finally:
+            clear_tables()
+
+
+def test_service_resources_are_per_thread(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    resources = []
+    thread = threading.Thread(target=lambda: resources.append(get_service_resource()))
+    thread.start()
+    thread.join()
+    assert get_service_resource() is get_service_resource()
+    assert resources[0] is not get_service_resource()
+    config = get_service_resource().meta.client.meta.config
+    assert config.max_pool_connections == DYNAMODB_MAX_POOL_CONNECTIONS
+    assert config.retries["mode"] == "adaptive"
+    assert config.tcp_keepalive
+
+
+def test_client_params_are_serialized():
+    params = _to_client_params(
+        "Workflows",
+        {
+            "KeyConditionExpression": Key("PartitionKey").eq(WORKFLOW_ID),
+            "ExclusiveStartKey": {"PartitionKey": WORKFLOW_ID, "SortKey": "x"},
+            "ExpressionAttributeNames": {"#x0": "Name"},
+        },
+    )
+    assert params["TableName"] == "Workflows"
+    assert params["KeyConditionExpression"] == "#n0 = :v0"
+    assert params["ExpressionAttributeNames"] == {"#x0": "Name", "#n0": "PartitionKey"}
+    assert params["ExpressionAttributeValues"] == {":v0": {"S": WORKFLOW_ID}}
+    assert params["ExclusiveStartKey"]["SortKey"] == {"S": "x"}
+
+
+def test_async_api_without_aioboto3_uses_worker_threads(table, client):
+    row = {k: {"S": v} for k, v in workflow_row(0).items()}
+    client.query.return_value = page([row])
+    with mock.patch("server.database._nosql.aioboto3", None):
+        workflow = asyncio.run(table.Workflow.aget(WORKFLOW_ID, WORKFLOW_ID))
+    assert workflow.Name == "Workflow 0"
+    kwargs = client.query.call_args.kwargs
+    assert kwargs["TableName"] == "Workflows"
+    assert kwargs["ExpressionAttributeValues"] == {
+        ":v0": {"S": WORKFLOW_ID},
+        ":v1": {"S": WORKFLOW_ID},
+    }
+
+
+def segmented_scan(pages_per_segment: int):
+    """A fake client Scan returning `pages_per_segment` pages for each segment"""
+
+    def scan(**kwargs):
+        segment = kwargs.get("Segment", 0)
+        page_number = int(
+            kwargs.get("ExclusiveStartKey", {}).get("Page", {"N": "0"})["N"]
+        )
+        row = workflow_row(segment * 10 + page_number)
+        response = page([{k: {"S": v} for k, v in row.items()}])
+        if page_number + 1 < pages_per_segment:
+            response["LastEvaluatedKey"] = {"Page": {"N": str(page_number + 1)}}
+        return response
+
+    return scan
+
+
+def test_parallel_scan_reads_every_page_of_every_segment(table, client):
+    client.scan.side_effect = segmented_scan(pages_per_segment=3)
+    names = {x.Name for x in table.Workflow.iter_scan(total_segments=4)}
+    assert names == {f"Workflow {s * 10 + p}" for s in range(4) for p in range(3)}
+    segments = {c.kwargs["Segment"] for c in client.scan.call_args_list}
+    assert segments == {0, 1, 2, 3}
+    assert all(c.kwargs["TotalSegments"] == 4 for c in client.scan.call_args_list)
+
+
+def test_async_parallel_scan_uses_scan_index(table, client):
+    client.scan.side_effect = segmented_scan(pages_per_segment=2)
+
+    async def scan():
+        return [x.Name async for x in table.Workflow.aiter_scan(total_segments=2)]
+
+    with mock.patch("server.database._nosql.aioboto3", None), mock.patch.object(
+        table.Workflow, "__scan_index__", "WorkflowIndex"
+    ):
+        names = asyncio.run(scan())
+    assert sorted(names) == ["Workflow 0", "Workflow 1", "Workflow 10", "Workflow 11"]
+    assert all(
+        c.kwargs["IndexName"] == "WorkflowIndex" for c in client.scan.call_args_list
+    )
+
+
+def test_continuation_tokens_round_trip():
+    key = {"PartitionKey": WORKFLOW_ID, "Number": Decimal("1.5")}
+    token = encode_start_key(key)
+    assert isinstance(token, str) and "=" not in token
+    assert decode_start_key(token) == key
+    assert encode_start_key(None) is None and decode_start_key(None) is None
+    with pytest.raises(ValueError):
+        decode_start_key("not a token")
+
+
+def test_fetch_page_reads_up_to_limit_rows(table):
+    table._table.query.side_effect = [
+        page([workflow_row(0)], last_key={"k": 1}),
+        page([workflow_row(1), workflow_row(2)], last_key={"k": 3}),
+    ]
+    response = table.Workflow.query(WORKFLOW_ID, limit=3)
+    assert [x.Name for x in response.items] == [
+        "Workflow 0",
+        "Workflow 1",
+        "Workflow 2",
+    ]
+    assert response.last_evaluated_key == {"k": 3}
+    calls = table._table.query.call_args_list
+    assert [c.kwargs["Limit"] for c in calls] == [PAGE_MIN_SIZE, PAGE_MIN_SIZE]
+    assert calls[1].kwargs["ExclusiveStartKey"] == {"k": 1}
+
+
+def test_fetch_page_reads_full_pages_when_a_filter_drops_rows(table):
+    # Node rows are dropped by the scan filter, they do not count towards limit
+    last_key = {"PartitionKey": "x", "SortKey": "x"}
+    table._table.scan.side_effect = [
+        page([workflow_row(0)], last_key=last_key),
+        page([workflow_row(i) for i in range(1, 5)]),
+    ]
+    response = table.Workflow.scan(limit=3)
+    assert [x.Name for x in response.items] == [
+        "Workflow 0",
+        "Workflow 1",
+        "Workflow 2",
+    ]
+    row = workflow_row(2)
+    assert response.last_evaluated_key == {
+        "PartitionKey": row["PartitionKey"],
+        "SortKey": row["SortKey"],
+    }
+    calls = table._table.scan.call_args_list
+    assert len(calls) == 2
+    assert all(c.kwargs["Limit"] == PAGE_MIN_SIZE for c in calls)
+
+
+def test_to_dynamodb_matches_json_round_trip():
+    node = WorkflowTable.Node(
+        PartitionKey=WORKFLOW_ID,
+        Label="Float",
+        Description="",
+        Address="nodes.builtins.producers.FloatProducer",
+        Group=None,
+        SubGroup=None,
+        Version=1,
+        Data={"value": {"Type": "options", "Schema": {}, "Value": [0.1, {"x": 2.5}]}},
+        Display={"x": 1.5, "y": 2.0},
+    )
+    expected = json.loads(node.model_dump_json(), parse_float=Decimal)
+    assert to_dynamodb(node) == expected
+    assert to_dynamodb(node)["Data"]["value"]["Value"] == [
+        Decimal("0.1"),
+        {"x": Decimal("2.5")},
+    ]
+
+
+def test_update_only_sets_the_given_attributes(table):
+    table._table.update_item.return_value = {
+        "Attributes": {**workflow_row(0), "Name": "Renamed"}
+    }
+    workflow = table.Workflow.update(WORKFLOW_ID, WORKFLOW_ID, Name="Renamed")
+    assert workflow is not None and workflow.Name == "Renamed"
+    params = table._table.update_item.call_args.kwargs
+    assert params["UpdateExpression"] == "SET #x0 = :v0"
+    assert params["ExpressionAttributeNames"] == {"#x0": "Name"}
+    assert params["ExpressionAttributeValues"] == {":v0": "Renamed"}
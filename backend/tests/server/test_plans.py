@@ -0,0 +1,105 @@
+import pytest
+from unittest import mock
+from nodes.base import NodeData
+from nodes.errors import WorkflowEdgeConflictException
+from nodes.builtins.producers import StringProducer
+from nodes.builtins.transforms import ToString
+from nodes.workflow import ExecutionPlan, Workflow
+from server.database.tables import WorkflowTable
+from server.plans import WorkflowPlan, PlanCache
+
+WORKFLOW_ID = "Workflow-" + "a" * 22
+REGISTRY = {x.address(): {x.__version__: x} for x in [StringProducer, ToString]}
+
+
+def get_node_class(address: str, version: int):
+    return REGISTRY[address][version]
+
+
+@pytest.fixture
+def items():
+    producer = WorkflowTable.Node(
+        PartitionKey=WORKFLOW_ID, **StringProducer.class_schema().model_dump()
+    )
+    producer.Data["options"].Value = {"value": "abc"}
+    to_string = WorkflowTable.Node(
+        PartitionKey=WORKFLOW_ID, **ToString.class_schema().model_dump()
+    )
+    edge = WorkflowTable.Edge(
+        PartitionKey=WORKFLOW_ID,
+        From={"NodeID": producer.ID, "Key": "output"},
+        To={"NodeID": to_string.ID, "Key": "value"},
+        IsSubset=True,
+    )
+    return [edge, to_string, producer]
+
+
+def test_compile_orders_nodes_for_execution(items):
+    edge, to_string, producer = items
+    plan = WorkflowPlan.compile(WORKFLOW_ID, 1, items, get_node_class)
+    assert [x.id for x in plan.nodes] == [producer.ID, to_string.ID]
+    assert plan.edges[0].source == (producer.ID, "output")
+
+
+def test_plans_built_from_pages_match_compiled_plans(items):
+    nodes, edges = [], []
+    for page in [items[:1], items[1:]]:
+        page_nodes, page_edges = WorkflowPlan.item_plans(page, get_node_class)
+        nodes.extend(page_nodes)
+        edges.extend(page_edges)
+    plan = WorkflowPlan.build(WORKFLOW_ID, 1, nodes, edges)
+    compiled = WorkflowPlan.compile(WORKFLOW_ID, 1, items, get_node_class)
+    assert [x.id for x in plan.nodes] == [x.id for x in compiled.nodes]
+    assert plan.edges == compiled.edges
+
+
+def test_instantiated_workflows_do_not_share_state(items):
+    plan = WorkflowPlan.compile(WORKFLOW_ID, 1, items, get_node_class)
+    first = plan.instantiate()
+    second = plan.instantiate()
+    assert first.run().Status == "Success"
+    assert first.get_node_by_id(items[1].ID).output.value == "abc"
+    assert second.get_node_by_id(items[1].ID).output.unset
+    assert second.run().Status == "Success"
+
+
+def test_plan_cache_is_keyed_by_revision(items):
+    cache = PlanCache()
+    plan = WorkflowPlan.compile(WORKFLOW_ID, 1, items, get_node_class)
+    cache.put(plan)
+    assert cache.get(WORKFLOW_ID, 1) is plan
+    assert cache.get(WORKFLOW_ID, 2) is None
+    cache.put(WorkflowPlan.compile(WORKFLOW_ID, 0, items, get_node_class))
+    assert cache.get(WORKFLOW_ID, 1) is plan
+    cache.invalidate(WORKFLOW_ID)
+    assert cache.get(WORKFLOW_ID, 1) is None
+
+
+def test_instantiate_reuses_the_compiled_wiring_and_order(items):
+    plan = WorkflowPlan.compile(WORKFLOW_ID, 1, items, get_node_class)
+    with mock.patch.object(Workflow, "add_edge") as add_edge, mock.patch.object(
+        ExecutionPlan, "build"
+    ) as build, mock.patch.object(NodeData, "validate") as validate:
+        workflow = plan.instantiate()
+        assert [x.id for x in workflow.plan()] == [x.id for x in plan.nodes]
+    add_edge.assert_not_called()
+    build.assert_not_called()
+    validate.assert_not_called()
+    assert workflow.run().Status == "Success"
+
+
+def test_compile_names_conflicting_edges_into_one_input(items):
+    edge, to_string, producer = items
+    other = WorkflowTable.Node(
+        PartitionKey=WORKFLOW_ID, **StringProducer.class_schema().model_dump()
+    )
+    other.Data["options"].Value = {"value": "def"}
+    duplicate = WorkflowTable.Edge(
+        PartitionKey=WORKFLOW_ID,
+        From={"NodeID": other.ID, "Key": "output"},
+        To={"NodeID": to_string.ID, "Key": "value"},
+        IsSubset=True,
+    )
+    with pytest.raises(WorkflowEdgeConflictException) as e:
+        WorkflowPlan.compile(WORKFLOW_ID, 1, [*items, other, duplicate], get_node_class)
+    assert edge.ID in str(e.value) and duplicate.ID in str(e.value)